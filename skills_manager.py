@@ -5,14 +5,41 @@ Reference: .agent/skills/scripts/skills_manager.py
 """
 
 import argparse
+import bisect
+import builtins
+import fnmatch
+import functools
+import hashlib
+import io
+import itertools
+import json
 import sys
 import os
+import pathlib
+import re
 import shutil
 import subprocess
+import time
+import zipfile
+from contextlib import contextmanager
 from pathlib import Path
 from typing import List, Optional
 
+try:
+    import fcntl
+except ImportError:  # Windows: advisory locking is skipped
+    fcntl = None
+
 # --- Configuration as per REQUIREMENT.md ---
+# Root of the cloned global repository (git working tree)
+GLOBAL_REPO_ROOT_WINDOWS = Path(os.path.expandvars(r"$USERPROFILE\.agent\skills"))
+GLOBAL_REPO_ROOT_UNIX = Path.home() / ".agent" / "skills"
+
+if os.name == 'nt':
+    GLOBAL_REPO_ROOT = GLOBAL_REPO_ROOT_WINDOWS
+else:
+    GLOBAL_REPO_ROOT = GLOBAL_REPO_ROOT_UNIX
+
 GLOBAL_SKILLS_REPO_WINDOWS = Path(os.path.expandvars(r"$USERPROFILE\.agent\skills\skills"))
 # Linux/Mac fallback:
 GLOBAL_SKILLS_REPO_UNIX = Path.home() / ".agent" / "skills" / "skills"
@@ -40,6 +67,81 @@ if os.name == 'nt':
 else:
     WORKFLOWS_FILE = WORKFLOWS_FILE_UNIX
 
+# Persistent catalog cache (kept outside the git working tree)
+CACHE_DIR_WINDOWS = Path(os.path.expandvars(r"$USERPROFILE\.agent\cache\skills_manager"))
+CACHE_DIR_UNIX = Path.home() / ".agent" / "cache" / "skills_manager"
+
+if os.name == 'nt':
+    CACHE_DIR = CACHE_DIR_WINDOWS
+else:
+    CACHE_DIR = CACHE_DIR_UNIX
+
+CATALOG_FILENAME = "catalog.json"
+WORKFLOW_CACHE_FILENAME = "workflows.json"
+CATALOG_VERSION = 1
+
+# Set to a file path (or '-' for stderr) to emit per-command timings as JSON lines
+TIMINGS_JSON_ENV = "SKILLS_MANAGER_TIMINGS_JSON"
+
+# Additional bundle sources: team files via environment, project file next to .agent/skills
+TEAM_BUNDLES_ENV = "SKILLS_MANAGER_BUNDLES"
+PROJECT_BUNDLES_FILENAME = "BUNDLES.md"
+BUNDLE_INCLUDE_RE = re.compile(r"^<!--\s*include:\s*(.+?)\s*-->$")
+
+# Per-project workflow step tracking (stored in .agent/, next to the skills directory)
+WORKFLOW_STATE_FILENAME = "workflow_state.json"
+
+# Per-file content hash cache (CACHE_DIR) and copied-install baselines (.agent/)
+HASH_CACHE_FILENAME = "hashes.json"
+MANIFEST_FILENAME = "skills_manifest.json"
+
+# Shell completion: sorted 'kind<TAB>name' lines in CACHE_DIR, and which
+# command positions complete which kind of name
+COMPLETION_FILENAME = "completion.txt"
+COMPLETION_KINDS = {
+    "install": "skill", "uninstall": "installed", "upgrade": "installed",
+    "bundle install": "bundle", "bundle uninstall": "bundle",
+    "workflow install": "workflow", "workflow uninstall": "workflow",
+}
+
+# Advisory locks: project lock next to .agent/skills, cache lock inside CACHE_DIR
+PROJECT_LOCK_FILENAME = ".skills.lock"
+CACHE_LOCK_FILENAME = ".lock"
+LOCK_TIMEOUT_ENV = "SKILLS_MANAGER_LOCK_TIMEOUT"
+LOCK_TIMEOUT = 30.0
+LOCK_POLL_INTERVAL = 0.05
+
+# Workflow search: field weights for the token index (a workflow's score sums, per query
+# token, the best weight it matched; partial token matches count half)
+WORKFLOW_FIELD_WEIGHTS = {
+    "name": 10, "id": 8, "skill": 6, "category": 4, "title": 4, "description": 3, "goal": 2, "notes": 1,
+}
+WORKFLOW_STEP_FIELDS = ("title", "goal", "notes")
+WORKFLOW_SEARCH_LIMIT = 20
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Removed copied skills are renamed into this directory (next to .agent/skills) and deleted afterwards
+TRASH_DIRNAME = ".skills-trash"
+TRASH_WORKERS = 8
+
+# Extra skill sources (directories or `pack` archives), highest priority first and
+# separated by os.pathsep; the global repository is always the lowest-priority source
+SKILL_SOURCES_ENV = "SKILLS_MANAGER_SOURCES"
+SOURCE_INDEX_DIRNAME = "sources"
+
+# Rough token estimate used for context budgets
+BYTES_PER_TOKEN = 4
+
+# Save the catalog after this many newly indexed skills (resumable reindex)
+REINDEX_CHECKPOINT = 500
+
+# Selector prefix for regular expressions (e.g. 're:^aws-'); '*', '?' and '[' make a glob
+SELECTOR_REGEX_PREFIX = "re:"
+
+# Packed archive layout (see `pack` / `unpack`)
+PACK_INDEX_NAME = "index.json"
+PACK_FORMAT = 1
+
 
 # --- Helper Functions ---
 def print_success(msg):
@@ -58,34 +160,1012 @@ def make_clickable(text: str, uri: str) -> str:
     """Returns an OSC 8 hyperlink string."""
     return f"\033]8;;{uri}\033\\{text}\033]8;;\033\\"
 
+# --- Instrumentation ---
+
+class OsCallCounter:
+    """
+    Instrumented shim around the filesystem calls made through `os` and `open`.
+    While installed, every call is reported to `on_call(name)`.
+    Used as a portable stand-in for syscall counting (no strace required).
+    On Python < 3.11, pathlib binds the `os` functions at import time in its
+    accessor, so those are wrapped as well.
+    """
+    OS_FUNCTIONS = ("stat", "lstat", "scandir", "listdir", "readlink", "symlink",
+                    "unlink", "rmdir", "mkdir", "rename", "replace", "open")
+
+    def __init__(self, on_call):
+        self.on_call = on_call
+        self.originals = {}
+
+    def wrap(self, name, func):
+        def counted(*args, **kwargs):
+            self.on_call(name)
+            return func(*args, **kwargs)
+        return counted
+
+    def install(self):
+        if self.originals:
+            return
+        for name in self.OS_FUNCTIONS:
+            func = getattr(os, name)
+            self.originals[("os", name)] = func
+            setattr(os, name, self.wrap(name, func))
+        self.originals[("io", "open")] = io.open
+        self.originals[("builtins", "open")] = builtins.open
+        io.open = self.wrap("open", io.open)
+        builtins.open = self.wrap("open", builtins.open)
+
+        accessor = getattr(pathlib, "_normal_accessor", None)
+        if accessor is not None:
+            for name in self.OS_FUNCTIONS:
+                if name in vars(type(accessor)) and name not in vars(accessor):
+                    self.originals[("accessor", name)] = None
+                    # Instance attributes shadow the class ones and are not bound to self
+                    setattr(accessor, name, self.wrap(name, getattr(accessor, name)))
+
+    def uninstall(self):
+        modules = {"os": os, "io": io, "builtins": builtins}
+        for (module, name), func in self.originals.items():
+            if module == "accessor":
+                delattr(pathlib._normal_accessor, name)
+            else:
+                setattr(modules[module], name, func)
+        self.originals = {}
+
+class PhaseTimer:
+    """
+    Collects exclusive wall time, item counts and filesystem call counts per phase
+    (scan, parse, resolve, link, render). Nested phases pause their parent.
+    Disabled by default; costs a single attribute check per phase when off.
+    """
+    PHASES = ("scan", "parse", "resolve", "link", "render")
+
+    def __init__(self):
+        self.enabled = False
+        self.reset()
+
+    def reset(self):
+        self.stats = {p: {"seconds": 0.0, "calls": 0, "items": 0} for p in self.PHASES + ("other",)}
+        self.stack = []
+        self.started = self.last = time.perf_counter()
+        self.counter = OsCallCounter(self.record_call)
+
+    def enable(self):
+        if self.enabled:
+            return
+        self.reset()
+        self.enabled = True
+        self.counter.install()
+
+    def disable(self):
+        self.counter.uninstall()
+        self.enabled = False
+
+    def current(self) -> str:
+        return self.stack[-1] if self.stack else "other"
+
+    def record_call(self, name: str):
+        self.stats[self.current()]["calls"] += 1
+
+    def switch(self):
+        now = time.perf_counter()
+        self.stats[self.current()]["seconds"] += now - self.last
+        self.last = now
+
+    @contextmanager
+    def phase(self, name: str):
+        if not self.enabled:
+            yield
+            return
+        self.switch()
+        self.stack.append(name)
+        try:
+            yield
+        finally:
+            self.switch()
+            self.stack.pop()
+
+    def add_items(self, name: str, count: int):
+        if self.enabled:
+            self.stats[name]["items"] += count
+
+    def report(self) -> dict:
+        self.switch()
+        return {
+            "total_seconds": round(time.perf_counter() - self.started, 6),
+            "phases": {
+                name: {"seconds": round(s["seconds"], 6), "calls": s["calls"], "items": s["items"]}
+                for name, s in self.stats.items()
+            },
+        }
+
+TIMER = PhaseTimer()
+
+def timed(phase: str):
+    """Decorator attributing a function's time to a phase; sized results count as items."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not TIMER.enabled:
+                return func(*args, **kwargs)
+            with TIMER.phase(phase):
+                result = func(*args, **kwargs)
+            TIMER.add_items(phase, len(result) if hasattr(result, '__len__') else 1)
+            return result
+        return wrapper
+    return decorator
+
+class TimedStream:
+    """Wraps stdout so that time spent writing output is attributed to 'render'."""
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write(self, text):
+        with TIMER.phase("render"):
+            TIMER.add_items("render", text.count("\n"))
+            return self.stream.write(text)
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+def print_timings(report: dict, command: str):
+    """Print the per-phase breakdown to stderr."""
+    out = sys.stderr
+    out.write(f"\n\033[1mTimings for '{command}'\033[0m\n")
+    out.write(f"  {'Phase':<10}{'Time (ms)':>12}{'FS calls':>10}{'Items':>8}\n")
+    for name, s in report["phases"].items():
+        if name == "other" and not s["calls"]:
+            continue
+        out.write(f"  {name:<10}{s['seconds'] * 1000:>12.2f}{s['calls']:>10}{s['items']:>8}\n")
+    out.write(f"  {'total':<10}{report['total_seconds'] * 1000:>12.2f}\n")
+
+def emit_timings_json(report: dict, command: str, target: str):
+    """Emit timings as one JSON line to stderr ('-') or append it to a file."""
+    line = json.dumps({"command": command, **report})
+    if target == "-":
+        sys.stderr.write(line + "\n")
+        return
+    try:
+        with open(target, 'a', encoding='utf-8') as f:
+            f.write(line + "\n")
+    except OSError as e:
+        print_warning(f"Could not write timings to {target}: {e}")
+
+@timed("scan")
 def get_skill_names(directory: Path) -> List[str]:
     """Return a sorted list of skill names (directories) in the given path."""
     if not directory.exists():
         return []
     return sorted([d.name for d in directory.iterdir() if d.is_dir() and not d.name.startswith('.')])
 
+@timed("scan")
 def get_symlink_names(directory: Path) -> List[str]:
     """Return a sorted list of symlinks in the given path."""
     if not directory.exists():
         return []
     return sorted([d.name for d in directory.iterdir() if d.is_symlink()])
 
+@timed("scan")
+def get_installed_names(directory: Path) -> List[str]:
+    """Return a sorted list of installed skills (symlinks and directories, not dot-entries)."""
+    if not directory.exists():
+        return []
+    with os.scandir(directory) as entries:
+        return sorted(e.name for e in entries if not e.name.startswith('.'))
+
+# --- Locking ---
+
+class LockTimeout(OSError):
+    """Raised when a lock could not be acquired within the timeout."""
+
+# Locks held by this process: { lock path: exclusive }. Nested acquisitions are no-ops,
+# so the outermost caller decides the mode.
+_HELD_LOCKS = {}
+
+def get_lock_timeout() -> float:
+    """Lock timeout in seconds, overridable with SKILLS_MANAGER_LOCK_TIMEOUT."""
+    try:
+        return float(os.environ.get(LOCK_TIMEOUT_ENV, LOCK_TIMEOUT))
+    except ValueError:
+        return LOCK_TIMEOUT
+
+def acquire_lock_fd(path: Path, exclusive: bool, timeout: Optional[float]) -> int:
+    """Open the lockfile and flock it, polling until `timeout` seconds have passed."""
+    timeout = get_lock_timeout() if timeout is None else timeout
+    deadline = time.monotonic() + timeout
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    while True:
+        try:
+            fcntl.flock(fd, (fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH) | fcntl.LOCK_NB)
+            return fd
+        except BlockingIOError:
+            if time.monotonic() >= deadline:
+                os.close(fd)
+                mode = "exclusive" if exclusive else "shared"
+                raise LockTimeout(f"Timed out after {timeout:g}s waiting for {mode} lock on {path}")
+            time.sleep(LOCK_POLL_INTERVAL)
+
+@contextmanager
+def file_lock(path: Path, exclusive: bool = False, timeout: Optional[float] = None, create: bool = True):
+    """
+    Hold an advisory fcntl lock on `path`: shared for readers, exclusive for writers.
+    Polls until `timeout` seconds have passed, then raises LockTimeout.
+    If the directory does not exist (and `create` is False, or the lock is shared), nothing
+    is locked or created up front; acquire_deferred_lock() takes the lock once a writer
+    creates the directory.
+    """
+    key = str(path)
+    if fcntl is None or key in _HELD_LOCKS:
+        yield
+        return
+    if exclusive and create:
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+    held = {"exclusive": exclusive, "timeout": timeout, "fd": None}
+    if path.parent.is_dir():
+        held["fd"] = acquire_lock_fd(path, exclusive, timeout)
+    _HELD_LOCKS[key] = held
+    try:
+        yield
+    finally:
+        del _HELD_LOCKS[key]
+        if held["fd"] is not None:
+            fcntl.flock(held["fd"], fcntl.LOCK_UN)
+            os.close(held["fd"])
+
+def acquire_deferred_lock(path: Path):
+    """Take a lock that file_lock() entered while its directory did not exist yet."""
+    held = _HELD_LOCKS.get(str(path))
+    if held and held["fd"] is None and path.parent.is_dir():
+        held["fd"] = acquire_lock_fd(path, held["exclusive"], held["timeout"])
+
+def project_lock(exclusive: bool = False):
+    """
+    Lock guarding the project's .agent/skills (and the state files next to it).
+    Never creates .agent by itself: writers call ensure_project_dir().
+    """
+    return file_lock(PROJECT_SKILLS_DIR.parent / PROJECT_LOCK_FILENAME, exclusive, create=False)
+
+def ensure_project_dir(directory: Optional[Path] = None):
+    """Create the project skills directory (or `directory`) and take any deferred project lock."""
+    (directory or PROJECT_SKILLS_DIR).mkdir(parents=True, exist_ok=True)
+    acquire_deferred_lock(PROJECT_SKILLS_DIR.parent / PROJECT_LOCK_FILENAME)
+
+def cache_lock(exclusive: bool = False):
+    """Lock guarding the files in the global cache directory."""
+    return file_lock(CACHE_DIR / CACHE_LOCK_FILENAME, exclusive)
+
+def locked(exclusive: bool):
+    """Decorator running a command under the project lock."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with project_lock(exclusive):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+# --- Catalog Cache ---
+
+def file_stamp(path: Path) -> Optional[list]:
+    """Return [mtime_ns, size] for a file, or None if it cannot be stat'ed."""
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+def new_catalog() -> dict:
+    return {"version": CATALOG_VERSION, "skills": {}}
+
+def read_json_file(path: Path):
+    """Return parsed JSON from a file, or None if it is missing or unreadable."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def write_json_file(path: Path, data):
+    """Atomically write JSON via a per-process temp file and os.replace()."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + f".{os.getpid()}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+def load_catalog() -> dict:
+    """
+    Load the persistent catalog from CACHE_DIR.
+    A missing, unreadable or outdated catalog yields an empty one.
+    """
+    try:
+        with cache_lock():
+            catalog = read_json_file(CACHE_DIR / CATALOG_FILENAME)
+    except LockTimeout:
+        catalog = None
+    if not isinstance(catalog, dict) or catalog.get("version") != CATALOG_VERSION:
+        return new_catalog()
+    catalog.setdefault("skills", {})
+    return catalog
+
+def save_catalog(catalog: dict):
+    """Atomically write the catalog. Cache write failures are never fatal."""
+    try:
+        with cache_lock(exclusive=True):
+            write_json_file(CACHE_DIR / CATALOG_FILENAME, catalog)
+    except OSError:
+        pass
+
+def get_cached_section(catalog: dict, key: str, sources: List[Path]) -> Optional[dict]:
+    """
+    Return the cached section for data parsed from source files (bundles, workflows),
+    or None if any source moved, appeared, disappeared or changed since it was cached.
+    """
+    section = catalog.get(key)
+    if not section or not stamps_match(section.get("files") or [], sources):
+        return None
+    return section
+
+def stamps_match(files: List[list], sources: List[Path]) -> bool:
+    """
+    True if recorded [path, stamp] pairs start with exactly `sources` and
+    every recorded file (sources plus anything they included) is unchanged.
+    """
+    if [f[0] for f in files][:len(sources)] != [str(s) for s in sources]:
+        return False
+    return all(file_stamp(Path(path)) == stamp for path, stamp in files)
+
+def set_cached_section(catalog: dict, key: str, sources: List[Path], data, **extra):
+    catalog[key] = {"files": [[str(s), file_stamp(s)] for s in sources], "data": data, **extra}
+
+# --- Skill Sources ---
+
+# Per-process memos: { source: (stamp, names) } and (source stamps) -> merged index
+_SOURCE_NAMES = {}
+_MERGED_INDEX = {}
+
+def get_skill_sources() -> List[Path]:
+    """Skill sources in priority order: $SKILLS_MANAGER_SOURCES entries, then the global repo."""
+    sources = []
+    for entry in os.environ.get(SKILL_SOURCES_ENV, "").split(os.pathsep):
+        if entry.strip():
+            sources.append(Path(os.path.expanduser(entry.strip())).absolute())
+    sources.append(GLOBAL_SKILLS_REPO)
+    unique = []
+    for source in sources:
+        if source not in unique:
+            unique.append(source)
+    return unique
+
+def is_archive_source(source: Path) -> bool:
+    """Sources ending in .zip are archives created by `pack`."""
+    return source.suffix.lower() == ".zip"
+
+def scan_source(source: Path) -> List[str]:
+    """List the skill names a source provides (directory listing or archive index)."""
+    if not is_archive_source(source):
+        return get_skill_names(source)
+    try:
+        with zipfile.ZipFile(source) as zf:
+            return sorted(read_pack_index(zf)["skills"])
+    except (OSError, ValueError, zipfile.BadZipFile) as e:
+        print_warning(f"Skipping skill source {source}: {e}")
+        return []
+
+def get_source_names(source: Path) -> List[str]:
+    """
+    Skill names of one source, cached in its own file under CACHE_DIR/sources and
+    rebuilt only when the source's stamp (directory or archive mtime) changes.
+    """
+    stamp = file_stamp(source)
+    if stamp is None:
+        return []
+    key = str(source)
+    memo = _SOURCE_NAMES.get(key)
+    if memo and memo[0] == stamp:
+        return memo[1]
+
+    cache_path = CACHE_DIR / SOURCE_INDEX_DIRNAME / (hashlib.sha1(key.encode('utf-8')).hexdigest()[:16] + ".json")
+    try:
+        with cache_lock():
+            cached = read_json_file(cache_path)
+    except LockTimeout:
+        cached = None
+    if isinstance(cached, dict) and cached.get("path") == key and cached.get("stamp") == stamp:
+        names = cached["names"]
+    else:
+        names = scan_source(source)
+        try:
+            with cache_lock(exclusive=True):
+                write_json_file(cache_path, {"path": key, "stamp": stamp, "names": names})
+        except OSError:
+            pass
+    _SOURCE_NAMES[key] = (stamp, names)
+    return names
+
+def get_skill_index() -> dict:
+    """
+    Merged catalog of all sources: { skill name: source }.
+    A name in a higher-priority source shadows the same name further down.
+    """
+    per_source = [(source, get_source_names(source)) for source in get_skill_sources()]
+    key = tuple((str(source), str(_SOURCE_NAMES.get(str(source), (None,))[0])) for source, _ in per_source)
+    if key not in _MERGED_INDEX:
+        index = {}
+        with TIMER.phase("resolve"):
+            for source, names in per_source:
+                for name in names:
+                    index.setdefault(name, source)
+        _MERGED_INDEX.clear()
+        _MERGED_INDEX[key] = index
+    return _MERGED_INDEX[key]
+
+def get_skill_location(name: str, source: Path) -> Path:
+    """Path shown for a skill: its SKILL.md for directory sources, the archive otherwise."""
+    return source if is_archive_source(source) else source / name / "SKILL.md"
+
+def list_sources():
+    """Show the skill sources in priority order with their skill and shadowed counts."""
+    index = get_skill_index()
+    for priority, source in enumerate(get_skill_sources(), 1):
+        kind = "archive" if is_archive_source(source) else "directory"
+        if file_stamp(source) is None:
+            print_warning(f"{priority}. {source} ({kind}, missing)")
+            continue
+        names = get_source_names(source)
+        shadowed = sum(1 for n in names if index[n] != source)
+        note = f", {shadowed} shadowed" if shadowed else ""
+        print(f"  {priority}. {source} ({kind}, {len(names)} skills{note})")
+    print(f"\nTotal: {len(index)} skills")
+
+# --- Skill Sizes ---
+
+def measure_skill_md(skill_md: Path) -> Optional[dict]:
+    """Return bytes, lines and an approximate token count for a SKILL.md file."""
+    try:
+        data = skill_md.read_bytes()
+    except OSError:
+        return None
+    return measure_skill_data(data)
+
+def measure_skill_data(data: bytes) -> dict:
+    """Sizes of SKILL.md contents, wherever they were read from."""
+    lines = data.count(b"\n") + (1 if data and not data.endswith(b"\n") else 0)
+    tokens = (len(data) + BYTES_PER_TOKEN - 1) // BYTES_PER_TOKEN
+    return {"bytes": len(data), "lines": lines, "tokens": tokens}
+
+def get_skill_sizes(skills: List[tuple]) -> dict:
+    """
+    Sizes for (name, skill directory) pairs, cached per skill in the catalog.
+    A cached entry is reused while the SKILL.md path and its mtime/size are unchanged,
+    so a warm lookup costs a single stat per skill.
+    Returns a dict: { 'skill': {'bytes': .., 'lines': .., 'tokens': ..} or None }
+    """
+    catalog = load_catalog()
+    changed = False
+    sizes = {}
+    for name, skill_dir in skills:
+        skill_md = skill_dir / "SKILL.md"
+        stamp = file_stamp(skill_md)
+        if stamp is None:
+            sizes[name] = None
+            continue
+        entry = catalog["skills"].setdefault(name, {})
+        cached = entry.get("size")
+        if cached and cached.get("path") == str(skill_md) and cached.get("stamp") == stamp:
+            sizes[name] = cached
+            continue
+        size = measure_skill_md(skill_md)
+        if size is not None:
+            size.update(path=str(skill_md), stamp=stamp)
+            entry["size"] = size
+            changed = True
+        sizes[name] = size
+    if changed:
+        save_catalog(catalog)
+    return sizes
+
+def get_archive_skill_sizes(archive: Path, names: List[str]) -> Optional[dict]:
+    """SKILL.md sizes of skills in a packed archive, read from the archive; None if it is unreadable."""
+    sizes = {}
+    try:
+        with zipfile.ZipFile(archive) as zf:
+            for name in names:
+                try:
+                    sizes[name] = measure_skill_data(zf.read(f"skills/{name}/SKILL.md"))
+                except KeyError:
+                    sizes[name] = None
+    except (OSError, zipfile.BadZipFile):
+        return None
+    return sizes
+
+def format_size(size: Optional[dict]) -> str:
+    if not size:
+        return "\033[90m(no SKILL.md)\033[0m"
+    return f"\033[90m({size['bytes']:,} B, {size['lines']:,} lines, ~{size['tokens']:,} tokens)\033[0m"
+
+def resolve_installed_skill(item: Path) -> Path:
+    """Return the directory an installed skill points to (the symlink target, or itself)."""
+    if not item.is_symlink():
+        return item
+    target = Path(os.readlink(item))
+    if not target.is_absolute():
+        target = (item.parent / target).resolve()
+    return target
+
+def get_installed_skill_dirs() -> List[tuple]:
+    """(name, resolved directory) for every skill installed in the project."""
+    if not PROJECT_SKILLS_DIR.exists():
+        return []
+    result = []
+    for name in get_installed_names(PROJECT_SKILLS_DIR):
+        try:
+            result.append((name, resolve_installed_skill(PROJECT_SKILLS_DIR / name)))
+        except OSError:
+            continue
+    return result
+
+def check_token_budget(new_skills: List[str], max_tokens: int, removing: List[str] = ()) -> bool:
+    """
+    Guard for bundle/workflow installs: would the project exceed max_tokens once
+    `new_skills` are installed (and `removing` are gone)? Prints the reason if so.
+    """
+    installed = {name: path for name, path in get_installed_skill_dirs() if name not in set(removing)}
+    additions = [s for s in dict.fromkeys(new_skills) if s not in installed]
+
+    # Measure new skills where they will be installed from: their source directory or archive
+    index = get_skill_index()
+    on_disk = []
+    from_archives = {}
+    for skill in additions:
+        source = index.get(skill, GLOBAL_SKILLS_REPO)
+        if is_archive_source(source):
+            from_archives.setdefault(source, []).append(skill)
+        else:
+            on_disk.append((skill, source / skill))
+    sizes = get_skill_sizes(list(installed.items()) + on_disk)
+    for archive, names in from_archives.items():
+        archive_sizes = get_archive_skill_sizes(archive, names)
+        if archive_sizes is None:
+            print_error(f"Cannot measure skills in {archive}; refusing to install over a token limit. Nothing was installed.")
+            return False
+        sizes.update(archive_sizes)
+
+    current = sum(sizes[n]['tokens'] for n in installed if sizes.get(n))
+    added = sum(sizes[s]['tokens'] for s in additions if sizes.get(s))
+    if current + added <= max_tokens:
+        print_info(f"Token budget: ~{current + added:,} of {max_tokens:,} tokens after install.")
+        return True
+
+    print_error(f"Installing would bring the project to ~{current + added:,} tokens "
+                f"(limit {max_tokens:,}; currently ~{current:,}). Nothing was installed.")
+    largest = sorted((s for s in additions if sizes.get(s)), key=lambda s: -sizes[s]['tokens'])
+    for skill in largest[:10]:
+        print(f"  • {skill} {format_size(sizes[skill])}")
+    return False
+
+@locked(exclusive=False)
+def show_budget(max_tokens: Optional[int]):
+    """Show the context size of installed skills and suggest what to drop."""
+    print_info(f"Context budget for: {PROJECT_SKILLS_DIR}")
+    installed = get_installed_skill_dirs()
+    if not installed:
+        print_warning("No skills installed in this project.")
+        return
+
+    sizes = get_skill_sizes(installed)
+    ranked = sorted(installed, key=lambda item: -(sizes[item[0]] or {}).get('tokens', 0))
+    total = sum(s['tokens'] for s in sizes.values() if s)
+    total_bytes = sum(s['bytes'] for s in sizes.values() if s)
+
+    for name, _ in ranked:
+        size = sizes[name]
+        share = (size['tokens'] / total * 100) if size and total else 0
+        print(f"  • {name:<40} {format_size(size)} {share:5.1f}%")
+
+    print(f"\nTotal: ~{total:,} tokens ({total_bytes:,} B) across {len(installed)} skills")
+    if max_tokens is None:
+        return
+
+    if total <= max_tokens:
+        print_success(f"Within budget ({max_tokens:,} tokens).")
+        return
+
+    # Greedy: drop the largest skills until the project fits
+    excess = total - max_tokens
+    suggestions = []
+    for name, _ in ranked:
+        if excess <= 0:
+            break
+        if sizes[name]:
+            suggestions.append(name)
+            excess -= sizes[name]['tokens']
+    print_warning(f"Over budget by ~{total - max_tokens:,} tokens. Consider dropping:")
+    for name in suggestions:
+        print(f"  • {name} {format_size(sizes[name])}")
+    print(f"  python skills_manager.py uninstall {' '.join(suggestions)}")
+
+# --- Content Index ---
+
+def parse_frontmatter(text: str) -> dict:
+    """Parse simple 'key: value' pairs from a leading '---' frontmatter block."""
+    lines = text.splitlines()
+    if not lines or lines[0].strip() != '---':
+        return {}
+    meta = {}
+    for line in lines[1:]:
+        if line.strip() == '---':
+            break
+        key, sep, value = line.partition(':')
+        if sep and key.strip() and not line.startswith((' ', '\t')):
+            meta[key.strip()] = value.strip().strip('"\'')
+    return meta
+
+def index_skill(job: tuple) -> tuple:
+    """
+    Build the content-level catalog entry for one skill directory, or return None
+    as the entry if `known` (the [SKILL.md stamp, directory stamp] recorded in the
+    catalog) is still current. Runs in worker processes, so the freshness check is
+    sharded across the pool too; it only takes and returns plain data.
+    """
+    name, skill_dir, known = job
+    skill_dir = Path(skill_dir)
+    skill_md = skill_dir / "SKILL.md"
+    entry = {}
+
+    stamp = file_stamp(skill_md)
+    tree = skill_tree_stamp(skill_dir)
+    if known is not None and known == [stamp, tree]:
+        return name, None
+
+    if stamp is not None:
+        size = measure_skill_md(skill_md)
+        if size is not None:
+            size.update(path=str(skill_md), stamp=stamp)
+            entry["size"] = size
+        try:
+            frontmatter = parse_frontmatter(skill_md.read_text(encoding='utf-8', errors='replace'))
+        except OSError:
+            frontmatter = {}
+    else:
+        frontmatter = {}
+
+    entry["meta"] = {
+        "stamp": stamp,
+        "tree": tree,
+        "name": frontmatter.get("name", name),
+        "description": frontmatter.get("description", ""),
+        "files": tree[1],
+        "bytes": tree[2],
+    }
+    return name, entry
+
+def skill_tree_stamp(skill_dir: Path) -> list:
+    """[newest mtime_ns, file count, total bytes] over every file in a skill directory."""
+    newest = file_count = total_bytes = 0
+    for _, path in iter_skill_files(skill_dir):
+        try:
+            st = path.stat()
+        except OSError:
+            continue
+        newest = max(newest, st.st_mtime_ns)
+        file_count += 1
+        total_bytes += st.st_size
+    return [newest, file_count, total_bytes]
+
+def get_index_stamps(entry: Optional[dict]) -> Optional[list]:
+    """
+    [SKILL.md stamp, directory stamp] a catalog entry was indexed at, or None if it
+    has no content index. index_skill() compares them with the skill on disk.
+    """
+    if not entry or "meta" not in entry:
+        return None
+    return [entry["meta"].get("stamp"), entry["meta"].get("tree")]
+
+def reindex(jobs: Optional[int] = None, force: bool = False):
+    """
+    Build the content index for every global skill across a process pool.
+    Workers also decide which skills are up to date, so even a no-op run walks
+    the skill directories in parallel. Results are merged into the catalog and
+    checkpointed as they arrive, so an interrupted run resumes where it stopped.
+    """
+    jobs = jobs or os.cpu_count() or 1
+    print_info(f"Indexing Global Skills in: {GLOBAL_SKILLS_REPO}")
+    skills = get_skill_names(GLOBAL_SKILLS_REPO)
+    if not skills:
+        print_warning("No global skills found.")
+        return
+
+    catalog = load_catalog()
+    print_info(f"Checking {len(skills)} skills with {jobs} jobs...")
+    work = [(s, str(GLOBAL_SKILLS_REPO / s), None if force else get_index_stamps(catalog["skills"].get(s)))
+            for s in skills]
+    chunksize = max(1, len(work) // (jobs * 8))
+    show_progress = sys.stderr.isatty()
+    done = 0
+    indexed = 0
+    unsaved = 0
+
+    def merge(results):
+        nonlocal done, indexed, unsaved
+        for name, entry in results:
+            done += 1
+            if entry is not None:
+                catalog["skills"].setdefault(name, {}).update(entry)
+                indexed += 1
+                unsaved += 1
+            if unsaved >= REINDEX_CHECKPOINT:
+                save_catalog(catalog)
+                unsaved = 0
+            if show_progress:
+                sys.stderr.write(f"\r  Checked {done}/{len(work)} skills, indexed {indexed}")
+                sys.stderr.flush()
+            elif done % REINDEX_CHECKPOINT == 0:
+                print(f"  Checked {done}/{len(work)} skills, indexed {indexed}")
+
+    try:
+        if jobs == 1 or len(work) == 1:
+            merge(map(index_skill, work))
+        else:
+            import multiprocessing
+            with multiprocessing.Pool(jobs) as pool:
+                merge(pool.imap_unordered(index_skill, work, chunksize))
+    except KeyboardInterrupt:
+        if unsaved:
+            save_catalog(catalog)
+        print()
+        print_warning(f"Interrupted after {done} skills ({indexed} indexed). Run reindex again to resume.")
+        return
+    finally:
+        if show_progress:
+            sys.stderr.write("\n")
+
+    if not indexed:
+        print_success(f"Index is up to date ({len(skills)} skills).")
+        return
+    if unsaved:
+        save_catalog(catalog)
+    print_success(f"Indexed {indexed} of {len(skills)} skills ({len(skills) - indexed} unchanged).")
+
+# --- Content Hashing ---
+
+def load_hash_cache() -> dict:
+    """Per-file hash cache: { '/abs/path': [mtime_ns, size, sha256] }"""
+    try:
+        with cache_lock():
+            cache = read_json_file(CACHE_DIR / HASH_CACHE_FILENAME)
+    except LockTimeout:
+        cache = None
+    return cache if isinstance(cache, dict) else {}
+
+def save_hash_cache(cache: dict):
+    try:
+        with cache_lock(exclusive=True):
+            write_json_file(CACHE_DIR / HASH_CACHE_FILENAME, cache)
+    except OSError:
+        pass
+
+def hash_file(path: Path, cache: dict) -> str:
+    """SHA-256 of a file, reusing the cached digest while mtime and size are unchanged."""
+    st = path.stat()
+    key = str(path)
+    cached = cache.get(key)
+    if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+        return cached[2]
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    cache[key] = [st.st_mtime_ns, st.st_size, digest.hexdigest()]
+    return cache[key][2]
+
+def hash_skill_dir(skill_dir: Path, cache: dict) -> tuple:
+    """
+    Merkle-style content hash of a skill directory.
+    Returns (root hash, { 'relative/path': file hash }); the root hash covers
+    the sorted relative paths and file hashes, so renames count as changes.
+    """
+    files = {rel: hash_file(path, cache) for rel, path in iter_skill_files(skill_dir)}
+    root = hashlib.sha256()
+    for rel in sorted(files):
+        root.update(f"{rel}\0{files[rel]}\n".encode('utf-8'))
+    return root.hexdigest(), files
+
+def get_manifest_path() -> Path:
+    """Baselines of copied installs live next to (not inside) the project skills directory."""
+    return PROJECT_SKILLS_DIR.parent / MANIFEST_FILENAME
+
+def load_manifest() -> dict:
+    """{ 'skill': { 'hash': root hash at install time, 'files': {...} } } for copied installs."""
+    manifest = read_json_file(get_manifest_path())
+    return manifest if isinstance(manifest, dict) else {}
+
+def save_manifest(manifest: dict):
+    path = get_manifest_path()
+    if not manifest and not path.exists():
+        return  # nothing copied yet; don't create .agent for an empty manifest
+    ensure_project_dir(path.parent)
+    write_json_file(path, manifest)
+
+def record_copied_install(skill_name: str, cache: dict, manifest: dict):
+    root, files = hash_skill_dir(PROJECT_SKILLS_DIR / skill_name, cache)
+    manifest[skill_name] = {"hash": root, "files": files}
+
+@locked(exclusive=True)
+def install_skill_copy(skill_names: List[str]):
+    """Install skills as copied directories and record their content baseline."""
+    index = get_skill_index()
+    selected = expand_skill_selectors(skill_names, lambda: sorted(index))
+    cache = load_hash_cache()
+    manifest = load_manifest()
+    from_archives = {}
+    for skill_name in selected:
+        source = index.get(skill_name)
+        dest_path = PROJECT_SKILLS_DIR / skill_name
+        if source is None:
+            print_error(f"Skill '{skill_name}' not found in global repo.")
+            continue
+        if is_archive_source(source):
+            from_archives.setdefault(source, []).append(skill_name)
+            continue
+        source_path = source / skill_name
+        if dest_path.exists() or dest_path.is_symlink():
+            print_warning(f"Skill '{skill_name}' is already installed in this project.")
+            continue
+        try:
+            with TIMER.phase("link"):
+                ensure_project_dir()
+                shutil.copytree(source_path, dest_path)
+            record_copied_install(skill_name, cache, manifest)
+            print_success(f"Installed {skill_name} (Local Directory)")
+        except OSError as e:
+            shutil.rmtree(dest_path, ignore_errors=True)
+            print_error(f"Installation failed: {e}")
+    save_manifest(manifest)
+    save_hash_cache(cache)
+
+    # Archive sources are always installed as copies; they record their own baselines
+    for archive, names in from_archives.items():
+        install_skill_from_archive(archive, names)
+
+def get_copy_status(skill_name: str, cache: dict, manifest: dict) -> tuple:
+    """
+    Compare a copied install with the skill in its source (resolved through
+    get_skill_index()) and its install-time baseline.
+    Returns (status, local files, source files, source skill directory); status is one of
+    'up-to-date', 'modified', 'outdated', 'modified, outdated', 'differs' (no baseline),
+    'archived' (provided by an archive source, never upgraded) or 'local only' (in no source).
+    """
+    local_hash, local_files = hash_skill_dir(PROJECT_SKILLS_DIR / skill_name, cache)
+    source = get_skill_index().get(skill_name)
+    if source is None:
+        return "local only", local_files, {}, None
+    if is_archive_source(source):
+        return "archived", local_files, {}, None
+    global_dir = source / skill_name
+    if not global_dir.is_dir():
+        return "local only", local_files, {}, None
+    global_hash, global_files = hash_skill_dir(global_dir, cache)
+
+    if local_hash == global_hash:
+        return "up-to-date", local_files, global_files, global_dir
+    baseline = manifest.get(skill_name, {}).get("hash")
+    if baseline is None:
+        return "differs", local_files, global_files, global_dir
+    states = []
+    if local_hash != baseline:
+        states.append("modified")
+    if global_hash != baseline:
+        states.append("outdated")
+    return ", ".join(states) or "up-to-date", local_files, global_files, global_dir
+
+@locked(exclusive=False)
+def show_status():
+    """Report up-to-date / modified / outdated for every installed skill."""
+    print_info(f"Checking Project Skills in: {PROJECT_SKILLS_DIR}")
+    if not PROJECT_SKILLS_DIR.exists():
+        print_warning("Project .agent/skills directory does not exist.")
+        return
+
+    cache = load_hash_cache()
+    manifest = load_manifest()
+    colors = {"up-to-date": "92", "linked": "92", "archived": "92"}
+    counts = {}
+    with os.scandir(PROJECT_SKILLS_DIR) as it:
+        entries = sorted((e for e in it if not e.name.startswith('.')), key=lambda e: e.name)
+
+    for entry in entries:
+        if entry.is_symlink():
+            status = "linked" if os.path.exists(entry.path) else "broken link"
+        elif entry.is_dir():
+            status = get_copy_status(entry.name, cache, manifest)[0]
+        else:
+            continue
+        counts[status] = counts.get(status, 0) + 1
+        print(f"  • {entry.name:<40} \033[{colors.get(status, '93')}m{status}\033[0m")
+
+    save_hash_cache(cache)
+    summary = ", ".join(f"{n} {status}" for status, n in sorted(counts.items()))
+    print(f"\nTotal: {sum(counts.values())} installed skills ({summary or 'none'})")
+
+@locked(exclusive=True)
+def upgrade_skills(skill_names: List[str], force: bool = False):
+    """
+    Bring outdated copied installs up to date from their skill source, copying only
+    the files whose hash changed and removing files the source no longer has.
+    Locally modified copies are skipped unless force is set; archive copies are never upgraded.
+    """
+    if not PROJECT_SKILLS_DIR.exists():
+        print_warning("Project .agent/skills directory does not exist.")
+        return
+
+    cache = load_hash_cache()
+    manifest = load_manifest()
+    installed = [n for n in get_installed_names(PROJECT_SKILLS_DIR) if not (PROJECT_SKILLS_DIR / n).is_symlink()]
+    selected = expand_skill_selectors(skill_names, lambda: installed) if skill_names else installed
+
+    upgraded = 0
+    for skill_name in selected:
+        local_dir = PROJECT_SKILLS_DIR / skill_name
+        if skill_name not in installed:
+            print_warning(f"Skill '{skill_name}' is not a copied install. Skipping.")
+            continue
+        status, local_files, global_files, source_dir = get_copy_status(skill_name, cache, manifest)
+        if status in ("up-to-date", "local only", "archived"):
+            continue
+        if "modified" in status and not force:
+            print_warning(f"{skill_name} has local modifications. Skipping (use --force to overwrite).")
+            continue
+        if status == "differs" and not force:
+            print_warning(f"{skill_name} has no install baseline. Skipping (use --force to overwrite).")
+            continue
+
+        changed = [rel for rel, h in global_files.items() if local_files.get(rel) != h]
+        removed = [rel for rel in local_files if rel not in global_files]
+        try:
+            with TIMER.phase("link"):
+                for rel in changed:
+                    target = local_dir / rel
+                    target.parent.mkdir(parents=True, exist_ok=True)
+                    shutil.copy2(source_dir / rel, target)
+                for rel in removed:
+                    (local_dir / rel).unlink()
+            record_copied_install(skill_name, cache, manifest)
+        except OSError as e:
+            print_error(f"Failed to upgrade {skill_name}: {e}")
+            continue
+        upgraded += 1
+        print_success(f"Upgraded {skill_name} ({len(changed)} files copied, {len(removed)} removed)")
+
+    save_manifest(manifest)
+    save_hash_cache(cache)
+    print_success(f"Upgrade complete. {upgraded} skills upgraded.")
+
 # --- Command Implementations ---
 
-def list_global():
+def list_global(show_sizes: bool = False):
     """3.1.1 List Global Skills"""
-    print_info(f"Listing Global Skills from: {GLOBAL_SKILLS_REPO}")
-    skills = get_skill_names(GLOBAL_SKILLS_REPO)
+    sources = get_skill_sources()
+    print_info(f"Listing Global Skills from: {', '.join(str(s) for s in sources)}")
+    index = get_skill_index()
+    skills = sorted(index)
+    on_disk = [(s, index[s] / s) for s in skills if not is_archive_source(index[s])]
+    sizes = get_skill_sizes(on_disk) if show_sizes else {}
     
     if skills:
         for skill in skills:
-            skill_path = GLOBAL_SKILLS_REPO / skill / "SKILL.md"
-            print(f"  • {make_clickable(skill, skill_path.as_uri())}")
+            source = index[skill]
+            suffix = f" {format_size(sizes[skill])}" if skill in sizes else ""
+            if source != GLOBAL_SKILLS_REPO:
+                suffix += f" ({source.name})"
+            print(f"  • {make_clickable(skill, get_skill_location(skill, source).as_uri())}{suffix}")
         print(f"\nTotal: {len(skills)} global skills")
     else:
         print_warning("No global skills found.")
 
-def list_project():
+@locked(exclusive=False)
+def list_project(show_sizes: bool = False):
     """3.1.2 List Project Skills"""
     print_info(f"Listing Project Skills in: {PROJECT_SKILLS_DIR}")
     
@@ -94,8 +1174,11 @@ def list_project():
         print_warning("Project .agent/skills directory does not exist.")
         return
 
-    items = sorted([x for x in PROJECT_SKILLS_DIR.iterdir()])
+    with TIMER.phase("scan"):
+        items = sorted([x for x in PROJECT_SKILLS_DIR.iterdir()])
+    TIMER.add_items("scan", len(items))
     skills_found = 0
+    sizes = get_skill_sizes(get_installed_skill_dirs()) if show_sizes else {}
     
     for item in items:
         if item.name.startswith('.'):
@@ -114,25 +1197,30 @@ def list_project():
                 
                 # Link to SKILL.md of the target
                 item_link = make_clickable(item.name, (target_path / "SKILL.md").as_uri())
+                suffix = f" {format_size(sizes.get(item.name))}" if show_sizes else ""
                 
-                print(f"  • {item_link} \033[90m-> {target}\033[0m (Symlink)")
+                print(f"  • {item_link} \033[90m-> {target}\033[0m (Symlink){suffix}")
             except OSError:
                  print(f"  • {item.name} (Invalid Symlink)")
             skills_found += 1
         elif is_dir:
-            print(f"  • {make_clickable(item.name, (item / 'SKILL.md').as_uri())} (Local Directory)")
+            suffix = f" {format_size(sizes.get(item.name))}" if show_sizes else ""
+            print(f"  • {make_clickable(item.name, (item / 'SKILL.md').as_uri())} (Local Directory){suffix}")
             skills_found += 1
             
     print(f"\nTotal: {skills_found} installed skills")
+    if show_sizes:
+        print(f"Context size: ~{sum(s['tokens'] for s in sizes.values() if s):,} tokens")
 
 def search_skills(query: str):
     """3.1.3 Search Skills"""
     print_info(f"Searching for '{query}' in Global Skills...")
-    if not GLOBAL_SKILLS_REPO.exists():
+    index = get_skill_index()
+    if not index and not GLOBAL_SKILLS_REPO.exists():
         print_error("Global skills repository not found.")
         return
 
-    all_skills = get_skill_names(GLOBAL_SKILLS_REPO)
+    all_skills = list(index)
     matches = []
     
     # Normalize query: lower case, remove symbols for 'fuzzy' check if needed
@@ -142,36 +1230,120 @@ def search_skills(query: str):
     
     norm_query = normalize(query)
     
-    for skill in all_skills:
-        # Standard case-insensitive search
-        if query.lower() in skill.lower():
-            matches.append(skill)
-            continue
-            
-        # Fuzzy search (stripping symbols)
-        if norm_query and norm_query in normalize(skill):
-            matches.append(skill)
+    with TIMER.phase("resolve"):
+        for skill in all_skills:
+            # Standard case-insensitive search
+            if query.lower() in skill.lower():
+                matches.append(skill)
+                continue
+                
+            # Fuzzy search (stripping symbols)
+            if norm_query and norm_query in normalize(skill):
+                matches.append(skill)
 
-    # Dedup matches
-    matches = sorted(list(set(matches)))
+        # Dedup matches
+        matches = sorted(list(set(matches)))
+    TIMER.add_items("resolve", len(all_skills))
 
     if matches:
         for m in matches:
-            skill_path = GLOBAL_SKILLS_REPO / m / "SKILL.md"
-            print(f"  • {make_clickable(m, skill_path.as_uri())}")
+            print(f"  • {make_clickable(m, get_skill_location(m, index[m]).as_uri())}")
         print(f"\nFound {len(matches)} matches.")
     else:
         print_warning("No matching skills found.")
 
+# --- Skill Selectors ---
+
+def is_pattern_selector(selector: str) -> bool:
+    """True for glob ('test*') and regex ('re:^aws-') selectors."""
+    return selector.startswith(SELECTOR_REGEX_PREFIX) or any(c in selector for c in "*?[")
+
+def read_selector_file(path: str) -> List[str]:
+    """Read selectors one per line from a file ('-' for stdin); blank lines and '#' comments are ignored."""
+    if path == "-":
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(path, 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+    return [line.strip() for line in lines if line.strip() and not line.strip().startswith('#')]
+
+def expand_skill_selectors(selectors: List[str], candidates) -> List[str]:
+    """
+    Resolve selectors to skill names in a single pass over the candidates.
+    Plain names pass through unchanged (validated by the caller); 'test*' globs
+    and 're:<pattern>' regexes are matched against candidates(), which is only
+    called if a pattern selector is present.
+    Returns the selected names in order, without duplicates.
+    """
+    selected = {}
+    matchers = []
+    for selector in selectors:
+        if not is_pattern_selector(selector):
+            selected[selector] = None
+            continue
+        try:
+            if selector.startswith(SELECTOR_REGEX_PREFIX):
+                matchers.append((selector, re.compile(selector[len(SELECTOR_REGEX_PREFIX):]).search))
+            else:
+                matchers.append((selector, re.compile(fnmatch.translate(selector)).match))
+        except re.error as e:
+            print_error(f"Invalid selector '{selector}': {e}")
+
+    if matchers:
+        hits = {selector: 0 for selector, _ in matchers}
+        with TIMER.phase("resolve"):
+            for name in candidates():
+                for selector, match in matchers:
+                    if match(name):
+                        selected[name] = None
+                        hits[selector] += 1
+        for selector, count in hits.items():
+            if not count:
+                print_warning(f"No skills match '{selector}'.")
+
+    return list(selected)
+
+def create_skill_link(source_path: Path, dest_path: Path) -> str:
+    """
+    Create a directory symlink, falling back to PowerShell on Windows.
+    Returns a short note about the method used; raises OSError on failure.
+    """
+    with TIMER.phase("link"):
+        if os.name == 'nt':
+            # Use PowerShell for reliable symlinking on Windows without requiring admin if Dev Mode is on,
+            # or simply because it handles the specialized permission checks better sometimes.
+            # But os.symlink is standard. Let's try os.symlink first.
+            try:
+                os.symlink(source_path, dest_path)
+                return ""
+            except FileExistsError:
+                raise
+            except OSError:
+                # Fallback to PowerShell as suggested in requirements
+                cmd = [
+                    "powershell", "-Command",
+                    f"New-Item -Path '{dest_path}' -ItemType SymbolicLink -Value '{source_path}'"
+                ]
+                result = subprocess.run(cmd, capture_output=True, text=True)
+                if result.returncode != 0:
+                    raise OSError(f"Failed to install skill: {result.stderr}")
+                return " (via PowerShell)"
+        os.symlink(source_path, dest_path)
+        return ""
+
 def install_skill_single(skill_name: str):
     """Internal function to install a single skill"""
-    source_path = GLOBAL_SKILLS_REPO / skill_name
+    source = get_skill_index().get(skill_name)
     dest_path = PROJECT_SKILLS_DIR / skill_name
 
     # 1. Validation
-    if not source_path.exists():
+    if source is None:
         print_error(f"Skill '{skill_name}' not found in global repo.")
         return
+    if is_archive_source(source):
+        install_skill_from_archive(source, [skill_name])
+        return
+    source_path = source / skill_name
 
     if dest_path.exists():
         print_warning(f"Skill '{skill_name}' is already installed in this project.")
@@ -180,40 +1352,157 @@ def install_skill_single(skill_name: str):
         return
 
     # 2. Ensure destination directory exists
-    PROJECT_SKILLS_DIR.mkdir(parents=True, exist_ok=True)
+    ensure_project_dir()
 
     # 3. Create Symlink
     print_info(f"Installing {skill_name}...")
+    TIMER.add_items("link", 1)
     try:
-        if os.name == 'nt':
-            # Use PowerShell for reliable symlinking on Windows without requiring admin if Dev Mode is on,
-            # or simply because it handles the specialized permission checks better sometimes.
-            # But os.symlink is standard. Let's try os.symlink first.
-            try:
-                os.symlink(source_path, dest_path)
-                print_success(f"Installed {skill_name}")
-            except OSError as e:
-                # Fallback to PowerShell as suggested in requirements
-                cmd = [
-                    "powershell", "-Command",
-                    f"New-Item -Path '{dest_path}' -ItemType SymbolicLink -Value '{source_path}'"
-                ]
-                result = subprocess.run(cmd, capture_output=True, text=True)
-                if result.returncode == 0:
-                     print_success(f"Installed {skill_name} (via PowerShell)")
-                else:
-                    print_error(f"Failed to install skill: {result.stderr}")
-        else:
-            os.symlink(source_path, dest_path)
-            print_success(f"Installed {skill_name}")
-
+        note = create_skill_link(source_path, dest_path)
+        print_success(f"Installed {skill_name}{note}")
+    except FileExistsError:
+        # Another process linked it between the check and the symlink call
+        print_warning(f"Skill '{skill_name}' is already installed in this project.")
     except Exception as e:
         print_error(f"Installation failed: {e}")
 
+def install_skill_batch(skill_names: List[str], announce: bool = False):
+    """
+    Install many skills in one operation: the project directory is created and
+    scanned once, then each missing skill is linked without per-skill re-checks.
+    Skills provided by archive sources are extracted, one pass per archive.
+    With announce, an "Installing <skill>..." line precedes each skill (bundle and workflow output).
+    """
+    index = get_skill_index()
+    from_archives = {}
+    for skill_name in skill_names:
+        source = index.get(skill_name, GLOBAL_SKILLS_REPO)
+        if is_archive_source(source):
+            from_archives.setdefault(source, []).append(skill_name)
+    for archive, names in from_archives.items():
+        install_skill_from_archive(archive, names)
+    if from_archives:
+        skill_names = [n for n in skill_names if not is_archive_source(index.get(n, GLOBAL_SKILLS_REPO))]
+        if not skill_names:
+            return
+
+    ensure_project_dir()
+    with TIMER.phase("scan"):
+        with os.scandir(PROJECT_SKILLS_DIR) as entries:
+            installed = {e.name for e in entries}
+
+    print_info(f"Installing {len(skill_names)} skills...")
+    installed_count = 0
+    for skill_name in skill_names:
+        if announce:
+            print(f"  Installing {skill_name}...")
+        if skill_name in installed:
+            print_warning(f"Skill '{skill_name}' is already installed in this project.")
+            continue
+
+        TIMER.add_items("link", 1)
+        try:
+            source = index.get(skill_name, GLOBAL_SKILLS_REPO)
+            note = create_skill_link(source / skill_name, PROJECT_SKILLS_DIR / skill_name)
+            print_success(f"Installed {skill_name}{note}")
+            installed.add(skill_name)
+            installed_count += 1
+        except FileExistsError:
+            print_warning(f"Skill '{skill_name}' is already installed in this project.")
+        except Exception as e:
+            print_error(f"Installation of {skill_name} failed: {e}")
+
+    print_success(f"Batch installation complete. Installed {installed_count} of {len(skill_names)} skills.")
+
+@locked(exclusive=True)
 def install_skill(skill_names: List[str]):
     """3.2.1 Install Skill(s)"""
-    for skill in skill_names:
-        install_skill_single(skill)
+    index = get_skill_index()
+    install_skill_names(expand_skill_selectors(skill_names, lambda: sorted(index)), index)
+
+def install_skill_names(selected: List[str], index: dict, announce: bool = False):
+    """Install resolved skill names: one goes through install_skill_single, more through one batch."""
+    if len(selected) <= 1:
+        for skill in selected:
+            if announce:
+                print(f"  Installing {skill}...")
+            install_skill_single(skill)
+        return
+
+    found = []
+    for skill in selected:
+        if skill in index:
+            found.append(skill)
+        else:
+            print_error(f"Skill '{skill}' not found in global repo.")
+    if found:
+        install_skill_batch(found, announce)
+
+# Set when this process moved something into the trash that has not been purged yet
+_TRASH_PENDING = []
+
+def get_trash_dir() -> Path:
+    """Trash area on the same filesystem as the project skills, so moves are atomic renames."""
+    return PROJECT_SKILLS_DIR.parent / TRASH_DIRNAME
+
+def move_to_trash(path: Path):
+    """Atomically move a copied skill out of the project; its deletion happens in empty_trash()."""
+    trash = get_trash_dir()
+    trash.mkdir(parents=True, exist_ok=True)
+    os.rename(path, trash / f"{path.name}.{os.getpid()}.{time.time_ns()}")
+    _TRASH_PENDING[:] = [trash]
+
+def remove_project_entry(entry: os.DirEntry) -> str:
+    """
+    Remove one project entry using the type information from scandir:
+    symlinks and files are unlinked, copied directories are moved to the trash.
+    Returns 'symlink' or 'directory'.
+    """
+    if entry.is_symlink() or not entry.is_dir(follow_symlinks=False):
+        os.unlink(entry.path)
+        return "symlink"
+    if GLOBAL_SKILLS_REPO in Path(entry.path).parents:
+        raise ValueError("Safety Stop: Target seems to be inside Global Repo.")
+    move_to_trash(Path(entry.path))
+    return "directory"
+
+def purge_trash(trash: Path):
+    """
+    Delete everything in the trash area, several directories in parallel.
+    The trash directory itself is kept: removing it could race with another
+    invocation's mkdir() + rename() in move_to_trash().
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    try:
+        with os.scandir(trash) as it:
+            paths = [e.path for e in it]
+    except OSError:
+        return
+    if paths:
+        with ThreadPoolExecutor(max_workers=min(TRASH_WORKERS, len(paths))) as pool:
+            list(pool.map(lambda p: shutil.rmtree(p, ignore_errors=True), paths))
+
+def empty_trash(wait: bool = False):
+    """
+    Delete trashed skills: synchronously (in parallel) with wait=True, otherwise in a
+    detached background process so the command returns immediately.
+    """
+    if not _TRASH_PENDING:
+        return
+    trash = _TRASH_PENDING.pop()
+    if wait:
+        with TIMER.phase("link"):
+            purge_trash(trash)
+        return
+
+    kwargs = {"creationflags": 0x00000008} if os.name == 'nt' else {"start_new_session": True}  # DETACHED_PROCESS
+    try:
+        subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), "__purge-trash", str(trash)],
+            stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, **kwargs
+        )
+    except OSError:
+        purge_trash(trash)
 
 def uninstall_skill_single(skill_name: str):
     """Internal function to uninstall a single skill"""
@@ -223,80 +1512,245 @@ def uninstall_skill_single(skill_name: str):
         print_error(f"Skill '{skill_name}' is not installed in this project.")
         return
 
+    TIMER.add_items("link", 1)
     try:
-        if target.is_symlink() or target.is_file(): # Windows treated symlinked dirs as files sometimes in old pyt
-            target.unlink()
-            print_success(f"Uninstalled {skill_name} (Symlink removed)")
-        elif target.is_dir():
-            # Safety check: ensure we aren't deleting the global repo somehow
-            # (Though path logic prevents this, explicit check is good)
-            if GLOBAL_SKILLS_REPO in target.parents:
-                 print_error("Safety Stop: Target seems to be inside Global Repo. Aborting.")
-                 return
-            
-            # Ask for confirmation potentially, but requirements didn't specify interactive confirm.
-            shutil.rmtree(target)
-            print_success(f"Uninstalled {skill_name} (Directory removed)")
+        with TIMER.phase("link"):
+            if target.is_symlink() or target.is_file(): # Windows treated symlinked dirs as files sometimes in old pyt
+                target.unlink()
+                print_success(f"Uninstalled {skill_name} (Symlink removed)")
+            elif target.is_dir():
+                # Safety check: ensure we aren't deleting the global repo somehow
+                # (Though path logic prevents this, explicit check is good)
+                if GLOBAL_SKILLS_REPO in target.parents:
+                     print_error("Safety Stop: Target seems to be inside Global Repo. Aborting.")
+                     return
+                
+                # Ask for confirmation potentially, but requirements didn't specify interactive confirm.
+                move_to_trash(target)
+                print_success(f"Uninstalled {skill_name} (Directory removed)")
             
     except Exception as e:
         print_error(f"Uninstallation failed: {e}")
 
-def uninstall_skill(skill_names: List[str]):
+def uninstall_skill_batch(skill_names: List[str], announce: bool = False):
+    """
+    Uninstall many skills with a single scandir pass over the project directory;
+    entry types come from the scan instead of per-skill stat calls.
+    With announce, an "Uninstalling <skill>..." line precedes each skill (bundle and workflow output).
+    """
+    wanted = set(skill_names)
+    with TIMER.phase("scan"):
+        with os.scandir(PROJECT_SKILLS_DIR) as it:
+            entries = {e.name: e for e in it if e.name in wanted}
+
+    removed = 0
+    for skill_name in skill_names:
+        if announce:
+            print(f"  Uninstalling {skill_name}...")
+        entry = entries.get(skill_name)
+        if entry is None:
+            print_error(f"Skill '{skill_name}' is not installed in this project.")
+            continue
+
+        TIMER.add_items("link", 1)
+        try:
+            with TIMER.phase("link"):
+                kind = remove_project_entry(entry)
+            print_success(f"Uninstalled {skill_name} ({'Symlink' if kind == 'symlink' else 'Directory'} removed)")
+            removed += 1
+        except Exception as e:
+            print_error(f"Uninstallation of {skill_name} failed: {e}")
+
+    print_success(f"Batch uninstallation complete. Removed {removed} of {len(skill_names)} skills.")
+
+@locked(exclusive=True)
+def uninstall_skill(skill_names: List[str], wait: bool = False):
     """3.2.2 Uninstall Skill(s)"""
-    for skill in skill_names:
+    selected = expand_skill_selectors(skill_names, lambda: get_installed_names(PROJECT_SKILLS_DIR))
+    uninstall_skill_names(selected)
+    empty_trash(wait)
+
+def uninstall_skill_names(selected: List[str], announce: bool = False):
+    """Uninstall resolved skill names: one goes through uninstall_skill_single, more through one batch."""
+    if len(selected) > 1 and PROJECT_SKILLS_DIR.exists():
+        uninstall_skill_batch(selected, announce)
+        return
+    for skill in selected:
+        if announce:
+            print(f"  Uninstalling {skill}...")
         uninstall_skill_single(skill)
 
-def parse_bundles() -> dict:
+def get_bundle_sources() -> List[Path]:
     """
-    Parse BUNDLES.md to extract bundle names and their associated skills.
-    Returns a dict: { 'Bundle Name': ['skill1', 'skill2', ...] }
+    Bundle files in priority order: project-local (.agent/BUNDLES.md), team files
+    from SKILLS_MANAGER_BUNDLES (os.pathsep-separated), then the global BUNDLES.md.
+    A bundle defined in a higher-priority source shadows one with the same name.
     """
-    if not BUNDLES_FILE.exists():
-        return {}
+    sources = [PROJECT_SKILLS_DIR.parent / PROJECT_BUNDLES_FILENAME]
+    team = os.environ.get(TEAM_BUNDLES_ENV, "")
+    sources.extend(Path(p).expanduser() for p in team.split(os.pathsep) if p)
+    sources.append(BUNDLES_FILE)
+
+    # A file listed twice keeps its lowest-priority position (e.g. the global file)
+    unique = []
+    for src in reversed(sources):
+        if src not in unique:
+            unique.insert(0, src)
+    return unique
+
+def parse_bundle_skill_line(line: str) -> Optional[str]:
+    """
+    Extract the skill name from a bundle list item.
+    Example: - [`concise-planning`](../skills/concise-planning/): Description
+    """
+    # Extract link part: (../skills/concise-planning/)
+    start = line.find('(')
+    end = line.find(')')
+    if start == -1 or end == -1:
+        return None
+    link = line[start+1:end]
+    # Extract skill name from link
+    # link looks like ../skills/concise-planning/ or just ../skills/concise-planning
+    parts = link.split('/')
+    # Filter out empty strings and '..' and 'skills'
+    valid_parts = [p for p in parts if p and p not in ('..', 'skills')]
+    return valid_parts[0] if valid_parts else None
+
+def iter_bundle_file(bundles_file: Path, visited: dict):
+    """
+    Stream (bundle name, skills) pairs from a BUNDLES.md file, one bundle at a time.
+    `<!-- include: other.md -->` lines are followed (relative to the including file).
+    An include does not end the current bundle: items after it still belong to it,
+    and the bundle is yielded once complete (after the included bundles).
+    Every file read is recorded in `visited`, which also guards against include cycles.
+    """
+    key = os.path.abspath(bundles_file)
+    if key in visited:
+        return
+    visited[key] = bundles_file
+    if not bundles_file.exists():
+        return
 
-    bundles = {}
     current_bundle = None
+    skills = []
     
-    with open(BUNDLES_FILE, 'r', encoding='utf-8') as f:
+    with open(bundles_file, 'r', encoding='utf-8') as f:
         for line in f:
             line = line.strip()
+
+            include = BUNDLE_INCLUDE_RE.match(line)
+            if include:
+                target = Path(include.group(1).strip()).expanduser()
+                if not target.is_absolute():
+                    target = bundles_file.parent / target
+                yield from iter_bundle_file(target, visited)
+                continue
             
             # Detect Bundle Header (using ### as the delimiter for bundle names)
             if line.startswith('### '):
                 # Example: ### 🚀 The "Essentials" Starter Pack
-                raw_name = line.replace('###', '').strip()
-                # Clean up name: remove emojis, quotes, excessive text
-                # We'll keep the full name as the key for display, but index it nicely
-                current_bundle = raw_name
-                bundles[current_bundle] = []
+                # We keep the full name as the key for display
+                if current_bundle and skills:
+                    yield current_bundle, skills
+                current_bundle = line.replace('###', '').strip()
+                skills = []
                 continue
             
             # Detect Skill Link
-            # Example: - [`concise-planning`](../skills/concise-planning/): Description
             if current_bundle and line.startswith('- [`'):
-                try:
-                    # Extract link part: (../skills/concise-planning/)
-                    start = line.find('(')
-                    end = line.find(')')
-                    if start != -1 and end != -1:
-                        link = line[start+1:end]
-                        # Extract skill name from link
-                        # link looks like ../skills/concise-planning/ or just ../skills/concise-planning
-                        parts = link.split('/')
-                        # Filter out empty strings and '..' and 'skills'
-                        valid_parts = [p for p in parts if p and p not in ('..', 'skills')]
-                        if valid_parts:
-                            skill_name = valid_parts[0]
-                            bundles[current_bundle].append(skill_name)
-                except Exception:
-                    continue
-                    
-    # Filter out empty bundles
-    return {k: v for k, v in bundles.items() if v}
+                skill_name = parse_bundle_skill_line(line)
+                if skill_name:
+                    skills.append(skill_name)
+
+    # Empty bundles are skipped
+    if current_bundle and skills:
+        yield current_bundle, skills
+
+def iter_bundles(sources: List[Path], visited: Optional[dict] = None):
+    """Stream bundles from all sources in priority order, skipping shadowed names."""
+    visited = {} if visited is None else visited
+    seen = set()
+    for source in sources:
+        for bundle_name, skills in iter_bundle_file(source, visited):
+            if bundle_name in seen:
+                continue
+            seen.add(bundle_name)
+            yield bundle_name, skills
+
+def normalize_name(name: str) -> str:
+    """Lower-case a name and drop everything but letters and digits."""
+    return "".join(c for c in name if c.isalnum()).lower()
+
+def build_bundle_index(bundles: dict) -> dict:
+    """Map normalized bundle names to bundle names for O(1) exact lookups."""
+    index = {}
+    for bundle_name in bundles:
+        index.setdefault(normalize_name(bundle_name), bundle_name)
+    return index
+
+def load_bundles_section() -> Optional[dict]:
+    """Return the cached bundles section if every source file is unchanged."""
+    return get_cached_section(load_catalog(), "bundles", get_bundle_sources())
+
+def store_bundles(bundles: dict, visited: dict):
+    catalog = load_catalog()
+    sources = get_bundle_sources()
+    # Top-level sources first (so missing ones are tracked too), then included files
+    files = sources + [p for k, p in visited.items() if k not in {os.path.abspath(s) for s in sources}]
+    set_cached_section(catalog, "bundles", files, bundles, index=build_bundle_index(bundles))
+    save_catalog(catalog)
+
+@timed("parse")
+def parse_bundles() -> dict:
+    """
+    Parse all bundle sources to extract bundle names and their associated skills.
+    Returns a dict: { 'Bundle Name': ['skill1', 'skill2', ...] }
+    The merged result is cached in the catalog until a source file changes.
+    """
+    section = load_bundles_section()
+    if section is not None:
+        return section["data"]
+
+    visited = {}
+    bundles = dict(iter_bundles(get_bundle_sources(), visited))
+    store_bundles(bundles, visited)
+    return bundles
+
+@timed("resolve")
+def find_bundle(bundle_query: str) -> Optional[tuple]:
+    """
+    Resolve a bundle query to (bundle name, skills).
+    1. Exact normalized-name match: O(1) through the cached index, or, without
+       a valid cache, by streaming the sources and stopping at the first hit.
+    2. Otherwise fall back to fuzzy (substring) matching via match_bundle().
+    """
+    norm_query = normalize_name(bundle_query)
+    section = load_bundles_section()
+
+    if section is not None:
+        bundles = section["data"]
+        exact = section.get("index", {}).get(norm_query)
+        if exact is not None:
+            return exact, bundles[exact]
+    else:
+        bundles = {}
+        visited = {}
+        for bundle_name, skills in iter_bundles(get_bundle_sources(), visited):
+            if norm_query and normalize_name(bundle_name) == norm_query:
+                return bundle_name, skills
+            bundles[bundle_name] = skills
+        # The full stream was read, so the result can be cached
+        store_bundles(bundles, visited)
+
+    target_bundle = match_bundle(bundles, bundle_query)
+    if target_bundle is None:
+        return None
+    return target_bundle, bundles[target_bundle]
 
 def list_bundles():
     """3.3.1 List Bundles"""
-    print_info(f"Listing Bundles from: {BUNDLES_FILE}")
+    sources = [s for s in get_bundle_sources() if s.exists()] or [BUNDLES_FILE]
+    print_info(f"Listing Bundles from: {', '.join(str(s) for s in sources)}")
     bundles = parse_bundles()
     
     if not bundles:
@@ -358,100 +1812,148 @@ def search_bundles(query: str):
         
     print(f"\nFound {len(matches)} matching bundles.")
 
-def install_bundle_single(bundle_query: str):
-    """Internal function to install single bundle"""
-    bundles = parse_bundles()
-    
+@timed("resolve")
+def match_bundle(bundles: dict, bundle_query: str) -> Optional[str]:
+    """
+    Resolve a (partial) bundle name to exactly one bundle.
+    Prints an error and returns None if nothing or more than one bundle matches.
+    """
     # Fuzzy match bundle name
     matches = [b for b in bundles.keys() if bundle_query.lower() in b.lower()]
     
     if not matches:
         print_error(f"No bundle found matching '{bundle_query}'")
-        return
+        return None
     
     if len(matches) > 1:
         print_warning(f"Multiple bundles match '{bundle_query}':")
         for m in matches:
             print(f"  • {m}")
         print("Please be more specific.")
-        return
+        return None
     
-    target_bundle = matches[0]
-    skills_to_install = bundles[target_bundle]
-    
-    print_info(f"Installing bundle: \033[1m{target_bundle}\033[0m ({len(skills_to_install)} skills)")
-    
-    success_count = 0
-    for skill in skills_to_install:
-        # Check if skill exists in listed global skills to avoid errors
-        # (Though install_skill verifies this too, it's good to be noisy here)
-        print(f"  Installing {skill}...")
-        install_skill_single(skill)
-        success_count += 1
-        
-    print_success(f"Bundle installation complete. processed {success_count} skills.")
+    return matches[0]
 
-def install_bundle(bundle_names: List[str]):
-    """3.3.2 Install Bundle(s)"""
-    for bundle_name in bundle_names:
-        install_bundle_single(bundle_name)
+def install_bundle_single(bundle_query: str, max_tokens: Optional[int] = None):
+    """Internal function to install single bundle"""
+    found = find_bundle(bundle_query)
+    if found is None:
+        return
+    target_bundle, bundle_skills = found
+    skills_to_install = bundle_skills
 
-def uninstall_bundle_single(bundle_query: str):
-    """Internal function to uninstall single bundle"""
-    bundles = parse_bundles()
-    
-    # Fuzzy match bundle name
-    matches = [b for b in bundles.keys() if bundle_query.lower() in b.lower()]
-    
-    if not matches:
-        print_error(f"No bundle found matching '{bundle_query}'")
+    if max_tokens is not None and not check_token_budget(skills_to_install, max_tokens):
         return
     
-    if len(matches) > 1:
-        print_warning(f"Multiple bundles match '{bundle_query}':")
-        for m in matches:
-            print(f"  • {m}")
-        print("Please be more specific.")
-        return
+    print_info(f"Installing bundle: \033[1m{target_bundle}\033[0m ({len(skills_to_install)} skills)")
     
-    target_bundle = matches[0]
-    skills_to_remove = bundles[target_bundle]
+    # One batch: a single scan of the project directory instead of per-skill checks
+    install_skill_names(skills_to_install, get_skill_index(), announce=True)
+        
+    print_success(f"Bundle installation complete. processed {len(skills_to_install)} skills.")
+
+@locked(exclusive=True)
+def install_bundle(bundle_names: List[str], max_tokens: Optional[int] = None):
+    """3.3.2 Install Bundle(s)"""
+    for bundle_name in bundle_names:
+        install_bundle_single(bundle_name, max_tokens)
+
+def uninstall_bundle_single(bundle_query: str):
+    """Internal function to uninstall single bundle"""
+    found = find_bundle(bundle_query)
+    if found is None:
+        return
+    target_bundle, bundle_skills = found
+    skills_to_remove = bundle_skills
     
     print_info(f"Uninstalling bundle: \033[1m{target_bundle}\033[0m ({len(skills_to_remove)} skills)")
     
-    success_count = 0
-    for skill in skills_to_remove:
-        print(f"  Uninstalling {skill}...")
-        uninstall_skill_single(skill)
-        success_count += 1
+    # One batch: a single scandir pass instead of per-skill stat calls
+    uninstall_skill_names(skills_to_remove, announce=True)
         
-    print_success(f"Bundle uninstallation complete. Processed {success_count} skills.")
+    print_success(f"Bundle uninstallation complete. Processed {len(skills_to_remove)} skills.")
 
-def uninstall_bundle(bundle_names: List[str]):
+@locked(exclusive=True)
+def uninstall_bundle(bundle_names: List[str], wait: bool = False):
     """3.3.3 Uninstall Bundle(s)"""
     for bundle_name in bundle_names:
         uninstall_bundle_single(bundle_name)
+    empty_trash(wait)
 
 # --- Workflow Implementations ---
 
-def parse_workflows() -> dict:
+def tokenize(text: str) -> List[str]:
+    """Lower-case alphanumeric tokens of a text."""
+    return TOKEN_RE.findall(text.lower())
+
+def build_workflow_index(workflows: dict) -> dict:
     """
-    Parse workflows.json to extract workflows.
-    Returns a dict mapping workflow ID/Name to the workflow object.
-    Key: workflow 'id' (e.g. 'ship-saas-mvp')
-    Value: valid dict from JSON
+    Per-field token index: { token: [[workflow id, field, step index], ...] }.
+    Workflow-level fields use step index -1; each posting appears once.
+    """
+    index = {}
+
+    def add(text: str, wf_id: str, field: str, step: int):
+        for token in set(tokenize(text)):
+            index.setdefault(token, []).append([wf_id, field, step])
+
+    for wf_id, wf in workflows.items():
+        add(wf_id, wf_id, "id", -1)
+        for field in ("name", "description", "category"):
+            add(wf.get(field, ''), wf_id, field, -1)
+        for i, step in enumerate(wf.get('steps', [])):
+            for field in WORKFLOW_STEP_FIELDS:
+                add(step.get(field, ''), wf_id, field, i)
+            for skill in step.get('recommendedSkills', []):
+                add(skill, wf_id, "skill", i)
+    return index
+
+def load_workflows_section() -> Optional[dict]:
+    """
+    Parse workflows.json into { 'data': workflows, 'index': token index, 'vocab': sorted tokens }.
+    All three are cached in their own file in CACHE_DIR (not the catalog, so workflow
+    commands never load skill metadata) until workflows.json changes.
     """
-    import json
     if not WORKFLOWS_FILE.exists():
-        return {}
+        return None
+
+    cache_path = CACHE_DIR / WORKFLOW_CACHE_FILENAME
+    try:
+        with cache_lock():
+            section = read_json_file(cache_path)
+    except LockTimeout:
+        section = None
+    if isinstance(section, dict) and "vocab" in section and stamps_match(section.get("files") or [], [WORKFLOWS_FILE]):
+        return section
 
     try:
         with open(WORKFLOWS_FILE, 'r', encoding='utf-8') as f:
             data = json.load(f)
-            return {w['id']: w for w in data.get('workflows', [])}
+            workflows = {w['id']: w for w in data.get('workflows', [])}
     except Exception as e:
         print_error(f"Failed to parse workflows.json: {e}")
-        return {}
+        return None
+
+    index = build_workflow_index(workflows)
+    section = {"files": [[str(WORKFLOWS_FILE), file_stamp(WORKFLOWS_FILE)]],
+               "data": workflows, "index": index, "vocab": sorted(index)}
+    try:
+        with cache_lock(exclusive=True):
+            write_json_file(cache_path, section)
+    except OSError:
+        pass
+    return section
+
+@timed("parse")
+def parse_workflows() -> dict:
+    """
+    Parse workflows.json to extract workflows.
+    Returns a dict mapping workflow ID/Name to the workflow object.
+    Key: workflow 'id' (e.g. 'ship-saas-mvp')
+    Value: valid dict from JSON
+    """
+    section = load_workflows_section()
+    return section["data"] if section else {}
 
 def list_workflows():
     """3.4.1 List Workflows"""
@@ -485,47 +1987,53 @@ def list_workflows():
 
     print(f"\nTotal: {len(workflows)} workflows available.")
 
-def search_workflows(query: str):
+@timed("resolve")
+def rank_workflows(index: dict, query: str, vocab: Optional[List[str]] = None) -> List[tuple]:
+    """
+    Score workflows against the query tokens using the token index.
+    Every query token must match (exactly, or as a prefix of an indexed token).
+    Prefix matches are found by binary search in `vocab`, the sorted index tokens.
+    Returns [(score, workflow id, {step index: set of matched fields})] best first.
+    """
+    if vocab is None:
+        vocab = sorted(index)
+    scores = None
+    steps = {}
+    for q in set(tokenize(query)):
+        terms = [(q, 1.0)] if q in index else []
+        i = bisect.bisect_right(vocab, q)
+        while i < len(vocab) and vocab[i].startswith(q):
+            terms.append((vocab[i], 0.5))
+            i += 1
+        best = {}
+        for term, factor in terms:
+            for wf_id, field, step in index[term]:
+                weight = WORKFLOW_FIELD_WEIGHTS[field] * factor
+                best[wf_id] = max(best.get(wf_id, 0), weight)
+                if step >= 0:
+                    steps.setdefault(wf_id, {}).setdefault(step, set()).add(field)
+        scores = best if scores is None else {w: scores[w] + best[w] for w in scores.keys() & best.keys()}
+        if not scores:
+            return []
+
+    return sorted(((score, wf_id, steps.get(wf_id, {})) for wf_id, score in (scores or {}).items()),
+                  key=lambda r: (-r[0], r[1]))
+
+def search_workflows(query: str, limit: Optional[int] = WORKFLOW_SEARCH_LIMIT):
     """3.4.2 Search Workflows"""
     print_info(f"Searching Workflows for '{query}'...")
-    workflows = parse_workflows()
+    with TIMER.phase("parse"):
+        section = load_workflows_section()
+    workflows = section["data"] if section else {}
     
-    matches = []
-    q = query.lower()
-    
-    for wf in workflows.values():
-        # Search match name, id, description, category
-        if (q in wf['id'].lower() or 
-            q in wf['name'].lower() or 
-            q in wf.get('description', '').lower() or
-            q in wf.get('category', '').lower()):
-            matches.append(wf)
-            continue
-            
-        # Search in steps (title, goal, notes, recommendedSkills)
-        found_in_steps = False
-        for step in wf.get('steps', []):
-            if (q in step.get('title', '').lower() or
-                q in step.get('goal', '').lower() or
-                q in step.get('notes', '').lower()):
-                found_in_steps = True
-                break
-            for skill in step.get('recommendedSkills', []):
-                if q in skill.lower():
-                    found_in_steps = True
-                    break
-            if found_in_steps:
-                break
-        
-        if found_in_steps:
-            matches.append(wf)
-
-    if not matches:
+    ranked = rank_workflows(section["index"], query, section["vocab"]) if section else []
+    if not ranked:
         print_warning(f"No workflows found matching '{query}'.")
         return
 
-    for wf in matches:
-        print(f"\n🔄 \033[1m{wf['name']}\033[0m (ID: {wf['id']})")
+    for score, wf_id, matched_steps in ranked[:limit]:
+        wf = workflows[wf_id]
+        print(f"\n🔄 \033[1m{wf['name']}\033[0m (ID: {wf['id']})  score {score:g}")
         print(f"   {wf.get('description', '')}")
         
         all_skills = set()
@@ -539,7 +2047,17 @@ def search_workflows(query: str):
             
         print(f"   Skills: {', '.join(display_skills)}")
 
-    print(f"\nFound {len(matches)} matching workflows.")
+        if matched_steps:
+            # Report the step that matched the most weight
+            step_index = max(matched_steps, key=lambda i: (sum(WORKFLOW_FIELD_WEIGHTS[f] for f in matched_steps[i]), -i))
+            title = wf['steps'][step_index].get('title', '')
+            fields = ", ".join(sorted(matched_steps[step_index], key=lambda f: -WORKFLOW_FIELD_WEIGHTS[f]))
+            print(f"   Matched step {step_index + 1}: {title} ({fields})")
+
+    if limit is not None and len(ranked) > limit:
+        print(f"\nFound {len(ranked)} matching workflows (showing {limit}; use --limit to see more).")
+    else:
+        print(f"\nFound {len(ranked)} matching workflows.")
 
 def get_skills_from_workflow(wf_data: dict) -> list:
     skills = set()
@@ -547,92 +2065,271 @@ def get_skills_from_workflow(wf_data: dict) -> list:
         skills.update(step.get('recommendedSkills', []))
     return sorted(list(skills))
 
-def install_workflow_single(query: str):
+@timed("resolve")
+def match_workflow(workflows: dict, query: str) -> Optional[dict]:
+    """
+    Resolve a workflow ID or (partial) name to exactly one workflow.
+    Prints an error and returns None if nothing or more than one workflow matches.
+    """
+    # Exact ID match first
+    if query in workflows:
+        return workflows[query]
+
+    # Fuzzy match name or ID
+    q = query.lower()
+    matches = [w for w in workflows.values() if q in w['id'].lower() or q in w['name'].lower()]
+    
+    if not matches:
+        print_error(f"No workflow found matching '{query}'")
+        return None
+    if len(matches) > 1:
+        print_warning(f"Multiple workflows found matching '{query}':")
+        for m in matches:
+            print(f"  • {m['name']} (ID: {m['id']})")
+        return None
+    return matches[0]
+
+def install_workflow_single(query: str, max_tokens: Optional[int] = None):
     """Internal function to install single workflow"""
     workflows = parse_workflows()
     
-    # Exact ID match first
-    if query in workflows:
-        target_wf = workflows[query]
-    else:
-        # Fuzzy match name or ID
-        q = query.lower()
-        matches = [w for w in workflows.values() if q in w['id'].lower() or q in w['name'].lower()]
-        
-        if not matches:
-            print_error(f"No workflow found matching '{query}'")
-            return
-        if len(matches) > 1:
-            print_warning(f"Multiple workflows found matching '{query}':")
-            for m in matches:
-                print(f"  • {m['name']} (ID: {m['id']})")
-            return
-        target_wf = matches[0]
+    target_wf = match_workflow(workflows, query)
+    if target_wf is None:
+        return
 
     skills_to_install = get_skills_from_workflow(target_wf)
+    if max_tokens is not None and not check_token_budget(skills_to_install, max_tokens):
+        return
     print_info(f"Installing workflow skills for: \033[1m{target_wf['name']}\033[0m ({len(skills_to_install)} skills)")
     
-    count = 0
-    for skill in skills_to_install:
-        print(f"  Installing {skill}...")
-        install_skill_single(skill)
-        count += 1
+    # One batch: a single scan of the project directory instead of per-skill checks
+    install_skill_names(skills_to_install, get_skill_index(), announce=True)
         
-    print_success(f"Workflow installation complete. Processed {count} skills.")
+    print_success(f"Workflow installation complete. Processed {len(skills_to_install)} skills.")
 
-def install_workflow(queries: List[str]):
+@locked(exclusive=True)
+def install_workflow(queries: List[str], max_tokens: Optional[int] = None):
     """3.4.3 Install Workflow Skills"""
     for query in queries:
-        install_workflow_single(query)
+        install_workflow_single(query, max_tokens)
 
 def uninstall_workflow_single(query: str):
     """Internal function to uninstall single workflow"""
     workflows = parse_workflows()
     
-    if query in workflows:
-        target_wf = workflows[query]
-    else:
-        q = query.lower()
-        matches = [w for w in workflows.values() if q in w['id'].lower() or q in w['name'].lower()]
-        
-        if not matches:
-            print_error(f"No workflow found matching '{query}'")
-            return
-        if len(matches) > 1:
-            print_warning(f"Multiple workflows found matching '{query}':")
-            for m in matches:
-                print(f"  • {m['name']} (ID: {m['id']})")
-            return
-        target_wf = matches[0]
+    target_wf = match_workflow(workflows, query)
+    if target_wf is None:
+        return
 
     skills_to_remove = get_skills_from_workflow(target_wf)
     print_info(f"Uninstalling workflow skills for: \033[1m{target_wf['name']}\033[0m ({len(skills_to_remove)} skills)")
     
-    count = 0
-    for skill in skills_to_remove:
-        print(f"  Uninstalling {skill}...")
-        uninstall_skill_single(skill)
-        count += 1
+    # One batch: a single scandir pass instead of per-skill stat calls
+    uninstall_skill_names(skills_to_remove, announce=True)
         
-    print_success(f"Workflow uninstallation complete. Processed {count} skills.")
+    print_success(f"Workflow uninstallation complete. Processed {len(skills_to_remove)} skills.")
 
-def uninstall_workflow(queries: List[str]):
+    state = load_workflow_state()
+    if state and state.get("workflow") == target_wf['id']:
+        clear_workflow_state()
+
+@locked(exclusive=True)
+def uninstall_workflow(queries: List[str], wait: bool = False):
     """3.4.4 Uninstall Workflow Skills"""
     for query in queries:
         uninstall_workflow_single(query)
+    empty_trash(wait)
+
+# --- Workflow Steps ---
+
+def get_workflow_state_path() -> Path:
+    """The step tracking file lives next to (not inside) the project skills directory."""
+    return PROJECT_SKILLS_DIR.parent / WORKFLOW_STATE_FILENAME
+
+def load_workflow_state() -> Optional[dict]:
+    """
+    Return the tracked workflow step for this project:
+    { 'workflow': id, 'step': 1-based step number, 'skills': [skills linked by step mode] }
+    """
+    state = read_json_file(get_workflow_state_path())
+    if not isinstance(state, dict) or not isinstance(state.get("workflow"), str):
+        return None
+    if not isinstance(state.get("step"), int) or state["step"] < 1:
+        return None
+    if not isinstance(state.get("skills"), list):
+        state["skills"] = []
+    return state
+
+def save_workflow_state(state: dict):
+    ensure_project_dir(get_workflow_state_path().parent)
+    write_json_file(get_workflow_state_path(), state)
+
+def clear_workflow_state():
+    try:
+        get_workflow_state_path().unlink()
+    except FileNotFoundError:
+        pass
+
+def get_step_skills(wf_data: dict, step: int) -> List[str]:
+    """Recommended skills of a 1-based workflow step, in order and without duplicates."""
+    return list(dict.fromkeys(wf_data['steps'][step - 1].get('recommendedSkills', [])))
+
+def apply_workflow_step(wf_data: dict, step: int, managed: List[str]) -> List[str]:
+    """
+    Swap the skills linked by step mode (`managed`) for the skills of `step`,
+    touching only the difference. Skills that were already installed by other
+    means are left alone and never become managed. Managed skills that were
+    removed from the project since are forgotten, and relinked if still wanted.
+    Returns the new list of managed skills.
+    """
+    wanted = get_step_skills(wf_data, step)
+    wanted_set = set(wanted)
+    managed = [s for s in managed if os.path.lexists(PROJECT_SKILLS_DIR / s)]
+    managed_set = set(managed)
+
+    to_remove = [s for s in managed if s not in wanted_set]
+    to_add = [s for s in wanted if s not in managed_set]
+
+    for skill in to_remove:
+        target = PROJECT_SKILLS_DIR / skill
+        TIMER.add_items("link", 1)
+        try:
+            with TIMER.phase("link"):
+                if target.is_symlink():
+                    target.unlink()
+                elif target.is_dir():
+                    move_to_trash(target)  # copy extracted from an archive source by step mode
+            print(f"  - {skill}")
+        except OSError as e:
+            print_error(f"Failed to remove {skill}: {e}")
+
+    new_managed = [s for s in managed if s in wanted_set]
+    active = len(new_managed)
+    index = get_skill_index() if to_add else {}
+    if to_add:
+        ensure_project_dir()
+    for skill in to_add:
+        source = index.get(skill)
+        dest_path = PROJECT_SKILLS_DIR / skill
+        if source is None:
+            print_error(f"Skill '{skill}' not found in global repo.")
+            continue
+        if dest_path.exists() or dest_path.is_symlink():
+            print(f"  = {skill} (already installed)")
+            active += 1
+            continue
+        TIMER.add_items("link", 1)
+        if is_archive_source(source):
+            install_skill_from_archive(source, [skill])
+            if dest_path.is_dir():
+                new_managed.append(skill)
+                active += 1
+                print(f"  + {skill}")
+            continue
+        source_path = source / skill
+        try:
+            create_skill_link(source_path, dest_path)
+            new_managed.append(skill)
+            active += 1
+            print(f"  + {skill}")
+        except FileExistsError:
+            print(f"  = {skill} (already installed)")
+            active += 1
+        except Exception as e:
+            print_error(f"Failed to install {skill}: {e}")
+
+    linked = len(new_managed) - (len(managed) - len(to_remove))
+    print_success(f"Step {step}/{len(wf_data['steps'])}: +{linked} -{len(to_remove)} skills "
+                  f"({active} active for this step)")
+    return new_managed
+
+@locked(exclusive=True)
+def install_workflow_step(query: str, step: int, max_tokens: Optional[int] = None):
+    """Install only the skills of one workflow step and start tracking it."""
+    target_wf = match_workflow(parse_workflows(), query)
+    if target_wf is None:
+        return
+    steps = target_wf.get('steps', [])
+    if not 1 <= step <= len(steps):
+        print_error(f"Workflow '{target_wf['id']}' has {len(steps)} steps; step {step} does not exist.")
+        return
+
+    # Switching workflows swaps out whatever the previous one linked
+    state = load_workflow_state() or {}
+    managed = state.get("skills", [])
+    wanted = get_step_skills(target_wf, step)
+    if max_tokens is not None and not check_token_budget(wanted, max_tokens, removing=[s for s in managed if s not in wanted]):
+        return
+
+    print_info(f"Workflow \033[1m{target_wf['name']}\033[0m — step {step}: {steps[step - 1].get('title', '')}")
+    managed = apply_workflow_step(target_wf, step, managed)
+    save_workflow_state({"workflow": target_wf['id'], "step": step, "skills": managed})
+
+@locked(exclusive=True)
+def next_workflow_step():
+    """Advance the tracked workflow to its next step, applying only the link diff."""
+    state = load_workflow_state()
+    if not state:
+        print_error("No workflow step is being tracked. Start with: workflow install <id> --step 1")
+        return
+
+    workflows = parse_workflows()
+    target_wf = workflows.get(state["workflow"])
+    if target_wf is None:
+        print_error(f"Tracked workflow '{state['workflow']}' no longer exists.")
+        return
+
+    step = state["step"] + 1
+    steps = target_wf.get('steps', [])
+    if state["step"] > len(steps):
+        print_error(f"Tracked step {state['step']} no longer exists; '{target_wf['id']}' now has {len(steps)} steps. "
+                    f"Restart with: workflow install {target_wf['id']} --step 1")
+        return
+    if step > len(steps):
+        print_warning(f"Already at the last step ({len(steps)}) of '{target_wf['id']}'.")
+        return
 
-def clear_all_skills(force: bool = False):
-    """3.4 Clear All Skills"""
+    print_info(f"Workflow \033[1m{target_wf['name']}\033[0m — step {step}: {steps[step - 1].get('title', '')}")
+    managed = apply_workflow_step(target_wf, step, state.get("skills", []))
+    save_workflow_state({"workflow": target_wf['id'], "step": step, "skills": managed})
+
+@locked(exclusive=False)
+def show_workflow_status():
+    """Show the tracked workflow step for this project."""
+    state = load_workflow_state()
+    if not state:
+        print_info("No workflow step is being tracked in this project.")
+        return
+
+    target_wf = parse_workflows().get(state["workflow"])
+    total = len(target_wf.get('steps', [])) if target_wf else "?"
+    print_info(f"Workflow: \033[1m{state['workflow']}\033[0m — step {state['step']}/{total}")
+    if target_wf is None:
+        print_warning(f"Tracked workflow '{state['workflow']}' no longer exists.")
+    elif state['step'] > total:
+        print_warning(f"Tracked step {state['step']} no longer exists; the workflow now has {total} steps.")
+    else:
+        step_data = target_wf['steps'][state['step'] - 1]
+        print(f"   {step_data.get('title', '')}")
+        if step_data.get('goal'):
+            print(f"   Goal: {step_data['goal']}")
+    print(f"   Linked by step mode: {', '.join(state.get('skills', [])) or '(None)'}")
+
+def clear_all_skills(force: bool = False, wait: bool = False):
+    """
+    3.4 Clear All Skills
+    One scandir pass; symlinks are unlinked and copied skills are renamed into the
+    trash, which is deleted in the background (or in parallel with wait=True).
+    """
     if not PROJECT_SKILLS_DIR.exists():
         print_warning("Project skills directory not found.")
         return
 
-    # Gather items to remove (symlinks and directories)
-    items_to_remove = []
-    for item in PROJECT_SKILLS_DIR.iterdir():
-        if item.name.startswith('.'):
-            continue
-        items_to_remove.append(item.name)
+    # Gather items to remove (symlinks and directories); types come from the scan
+    with TIMER.phase("scan"):
+        with os.scandir(PROJECT_SKILLS_DIR) as it:
+            items_to_remove = sorted((e for e in it if not e.name.startswith('.')), key=lambda e: e.name)
+    TIMER.add_items("scan", len(items_to_remove))
     
     if not items_to_remove:
         print_info("No skills installed in this project.")
@@ -651,29 +2348,611 @@ def clear_all_skills(force: bool = False):
 
     print_info(f"Removing {len(items_to_remove)} skills...")
     
+    # Locked after the confirmation prompt so a pending prompt never blocks other invocations
     success_count = 0
-    for skill_name in items_to_remove:
-        target = PROJECT_SKILLS_DIR / skill_name
+    with project_lock(exclusive=True):
+        TIMER.add_items("link", len(items_to_remove))
+        for entry in items_to_remove:
+            try:
+                with TIMER.phase("link"):
+                    remove_project_entry(entry)
+                print(f"  Removed {entry.name}")
+                success_count += 1
+            except FileNotFoundError as e:
+                if os.path.lexists(entry.path):
+                    print_error(f"Failed to remove {entry.name}: {e}")
+                # otherwise already removed by another invocation
+            except Exception as e:
+                print_error(f"Failed to remove {entry.name}: {e}")
+
+    empty_trash(wait)
+    print_success(f"Cleared {success_count} skills.")
+
+# --- Global Repository Maintenance ---
+
+def run_git(args: List[str], cwd: Path) -> subprocess.CompletedProcess:
+    """Run a git command in the given working tree and capture its output."""
+    return subprocess.run(["git", *args], cwd=cwd, capture_output=True, text=True)
+
+def classify_changed_paths(paths: List[str]) -> dict:
+    """
+    Map repository-relative paths (as printed by `git diff --name-only`)
+    to the catalog entries they affect.
+    Returns a dict: { 'skills': set of skill names, 'bundles': bool, 'workflows': bool }
+    """
+    changes = {"skills": set(), "bundles": False, "workflows": False}
+
+    def rel_parts(path: Path):
         try:
-            if target.is_symlink() or target.is_file():
-                target.unlink()
-            elif target.is_dir():
-                # Safety check (redundant but good practice)
-                if GLOBAL_SKILLS_REPO in target.parents:
-                     print_error(f"Skipping {skill_name}: Seems to be inside Global Repo.")
-                     continue
-                shutil.rmtree(target)
-            
-            print(f"  Removed {skill_name}")
-            success_count += 1
-        except Exception as e:
-            print_error(f"Failed to remove {skill_name}: {e}")
+            return path.relative_to(GLOBAL_REPO_ROOT).parts
+        except ValueError:
+            return None
 
-    print_success(f"Cleared {success_count} skills.")
+    skills_parts = rel_parts(GLOBAL_SKILLS_REPO)
+    bundles_parts = rel_parts(BUNDLES_FILE)
+    workflows_parts = rel_parts(WORKFLOWS_FILE)
+
+    for changed in paths:
+        parts = tuple(p for p in changed.strip().split('/') if p)
+        if not parts:
+            continue
+        if parts == bundles_parts:
+            changes["bundles"] = True
+        elif parts == workflows_parts:
+            changes["workflows"] = True
+        elif skills_parts is not None and len(parts) > len(skills_parts) and parts[:len(skills_parts)] == skills_parts:
+            skill_name = parts[len(skills_parts)]
+            if not skill_name.startswith('.'):
+                changes["skills"].add(skill_name)
+
+    return changes
+
+def invalidate_catalog(changes: dict):
+    """Drop only the catalog entries affected by the given changes."""
+    catalog = load_catalog()
+    for skill in changes["skills"]:
+        catalog["skills"].pop(skill, None)
+    if changes["bundles"]:
+        catalog.pop("bundles", None)
+    if changes["workflows"]:
+        catalog.pop("workflows", None)
+        try:
+            with cache_lock(exclusive=True):
+                (CACHE_DIR / WORKFLOW_CACHE_FILENAME).unlink()
+        except OSError:
+            pass
+    save_catalog(catalog)
+
+def update_global_repo():
+    """Pull the global repository and invalidate only what changed."""
+    print_info(f"Updating Global Repository: {GLOBAL_REPO_ROOT}")
+    if not (GLOBAL_REPO_ROOT / ".git").exists():
+        print_error("Global repository is not a git checkout. Cannot update.")
+        return
+
+    try:
+        head = run_git(["rev-parse", "HEAD"], GLOBAL_REPO_ROOT)
+        if head.returncode != 0:
+            print_error(f"Failed to read current revision: {head.stderr.strip()}")
+            return
+        old_rev = head.stdout.strip()
+
+        fetch = run_git(["fetch", "--quiet"], GLOBAL_REPO_ROOT)
+        if fetch.returncode != 0:
+            print_error(f"git fetch failed: {fetch.stderr.strip()}")
+            return
+
+        merge = run_git(["merge", "--ff-only", "--quiet", "@{u}"], GLOBAL_REPO_ROOT)
+        if merge.returncode != 0:
+            print_error(f"git merge failed: {merge.stderr.strip()}")
+            return
+
+        new_rev = run_git(["rev-parse", "HEAD"], GLOBAL_REPO_ROOT).stdout.strip()
+        if new_rev == old_rev:
+            print_success("Global repository is already up to date.")
+            return
+
+        # --no-renames: a moved skill must list its old path too, or its entries are never invalidated
+        diff = run_git(["diff", "--name-only", "--no-renames", old_rev, new_rev], GLOBAL_REPO_ROOT)
+        if diff.returncode != 0:
+            print_error(f"git diff failed: {diff.stderr.strip()}")
+            return
+    except FileNotFoundError:
+        print_error("git executable not found in PATH.")
+        return
+
+    changes = classify_changed_paths(diff.stdout.splitlines())
+    invalidate_catalog(changes)
+
+    print_success(f"Updated {old_rev[:7]}..{new_rev[:7]}")
+    print(f"  Skills changed: {len(changes['skills'])}")
+    if changes["bundles"]:
+        print("  BUNDLES.md changed")
+    if changes["workflows"]:
+        print("  workflows.json changed")
+
+    # Report which installed project skills were affected
+    if not PROJECT_SKILLS_DIR.exists():
+        return
+    installed = sorted(
+        item for item in PROJECT_SKILLS_DIR.iterdir()
+        if not item.name.startswith('.') and item.name in changes["skills"]
+    )
+    if not installed:
+        print_info("No installed project skills were affected.")
+        return
+
+    print_info(f"{len(installed)} installed project skills were updated:")
+    for item in installed:
+        if not (GLOBAL_SKILLS_REPO / item.name).exists():
+            print(f"  • {item.name} \033[93m(removed from global repo)\033[0m")
+        elif item.is_symlink():
+            print(f"  • {item.name} (Symlink, already up to date)")
+        else:
+            print(f"  • {item.name} \033[93m(Local Directory, not refreshed)\033[0m")
+
+# --- Offline Archives ---
+
+def render_bundles_markdown(bundles: dict) -> str:
+    """Render a bundle map back into the BUNDLES.md format understood by parse_bundles()."""
+    lines = ["# Bundles", ""]
+    for bundle_name, skills in bundles.items():
+        lines.append(f"### {bundle_name}")
+        for skill in skills:
+            lines.append(f"- [`{skill}`](../skills/{skill}/)")
+        lines.append("")
+    return "\n".join(lines)
+
+def iter_skill_files(skill_dir: Path):
+    """Yield (relative posix path, absolute path) for every regular file in a skill directory."""
+    for root, dirs, files in os.walk(skill_dir):
+        dirs.sort()
+        for filename in sorted(files):
+            path = Path(root) / filename
+            if path.is_file():
+                yield path.relative_to(skill_dir).as_posix(), path
+
+def is_safe_member(name: str) -> bool:
+    """Reject archive member names that could escape the extraction directory."""
+    parts = name.split('/')
+    return bool(name) and not name.startswith('/') and '..' not in parts and ':' not in parts[0]
+
+def read_pack_index(zf: zipfile.ZipFile) -> dict:
+    """Read and validate the central index of a skills archive."""
+    try:
+        index = json.loads(zf.read(PACK_INDEX_NAME).decode('utf-8'))
+    except KeyError:
+        raise ValueError(f"{PACK_INDEX_NAME} missing; not a skills archive")
+    if index.get("format") != PACK_FORMAT:
+        raise ValueError(f"Unsupported archive format: {index.get('format')}")
+    return index
+
+def extract_pack_skill(zf: zipfile.ZipFile, index: dict, skill_name: str, dest: Path):
+    """Extract one skill from an archive into dest using the index (no member scan)."""
+    prefix = f"skills/{skill_name}/"
+    dest.mkdir(parents=True, exist_ok=True)
+    for member in index["skills"][skill_name]:
+        if not member.startswith(prefix) or not is_safe_member(member):
+            raise ValueError(f"Unsafe archive member: {member}")
+        target = dest / member[len(prefix):]
+        target.parent.mkdir(parents=True, exist_ok=True)
+        with zf.open(member) as src, open(target, 'wb') as dst:
+            shutil.copyfileobj(src, dst)
+
+def pack_skills(archive_path: Path, skill_names: List[str], bundle_queries: List[str], workflow_queries: List[str]):
+    """Write selected skills plus the bundle and workflow maps into a single zip archive."""
+    bundles = parse_bundles()
+    workflows = parse_workflows()
+
+    selected = list(skill_names)
+    for query in bundle_queries:
+        target_bundle = match_bundle(bundles, query)
+        if target_bundle is None:
+            return
+        selected.extend(bundles[target_bundle])
+    for query in workflow_queries:
+        target_wf = match_workflow(workflows, query)
+        if target_wf is None:
+            return
+        selected.extend(get_skills_from_workflow(target_wf))
+    if not selected:
+        selected = get_skill_names(GLOBAL_SKILLS_REPO)
+
+    # Dedup while keeping order
+    selected = list(dict.fromkeys(selected))
+    missing = [s for s in selected if not (GLOBAL_SKILLS_REPO / s).is_dir()]
+    for skill in missing:
+        print_warning(f"Skill '{skill}' not found in global repo. Skipping.")
+    selected = [s for s in selected if s not in missing]
+
+    if not selected:
+        print_error("Nothing to pack.")
+        return
+
+    print_info(f"Packing {len(selected)} skills into {archive_path}...")
+    index = {"format": PACK_FORMAT, "skills": {}, "bundles": bundles, "workflows": workflows}
+    tmp_path = archive_path.with_name(archive_path.name + ".tmp")
+    try:
+        with zipfile.ZipFile(tmp_path, 'w', compression=zipfile.ZIP_DEFLATED) as zf:
+            for skill in selected:
+                members = []
+                for rel, path in iter_skill_files(GLOBAL_SKILLS_REPO / skill):
+                    member = f"skills/{skill}/{rel}"
+                    zf.write(path, member)
+                    members.append(member)
+                index["skills"][skill] = members
+            zf.writestr(PACK_INDEX_NAME, json.dumps(index))
+        os.replace(tmp_path, archive_path)
+    except OSError as e:
+        print_error(f"Failed to write archive: {e}")
+        tmp_path.unlink(missing_ok=True)
+        return
+
+    print_success(f"Packed {len(selected)} skills, {len(bundles)} bundles and {len(workflows)} workflows.")
+
+def unpack_archive(archive_path: Path, dest: Path):
+    """
+    Extract an archive into a directory laid out like the global repository:
+    skills/<name>/..., docs/BUNDLES.md and data/workflows.json.
+    """
+    try:
+        with zipfile.ZipFile(archive_path) as zf:
+            index = read_pack_index(zf)
+            print_info(f"Unpacking {len(index['skills'])} skills into {dest}...")
+            for skill in index["skills"]:
+                extract_pack_skill(zf, index, skill, dest / "skills" / skill)
+    except (OSError, ValueError, zipfile.BadZipFile) as e:
+        print_error(f"Failed to unpack archive: {e}")
+        return
+
+    (dest / "docs").mkdir(parents=True, exist_ok=True)
+    (dest / "docs" / "BUNDLES.md").write_text(render_bundles_markdown(index["bundles"]), encoding='utf-8')
+    (dest / "data").mkdir(parents=True, exist_ok=True)
+    with open(dest / "data" / "workflows.json", 'w', encoding='utf-8') as f:
+        json.dump({"workflows": list(index["workflows"].values())}, f, indent=2)
+
+    print_success(f"Unpacked {len(index['skills'])} skills, {len(index['bundles'])} bundles and {len(index['workflows'])} workflows.")
+
+@locked(exclusive=True)
+def install_skill_from_archive(archive_path: Path, skill_names: List[str]):
+    """Install skills as local copies read directly from an archive."""
+    try:
+        zf = zipfile.ZipFile(archive_path)
+    except (OSError, zipfile.BadZipFile) as e:
+        print_error(f"Cannot open archive: {e}")
+        return
+
+    cache = load_hash_cache()
+    manifest = load_manifest()
+    with zf:
+        try:
+            index = read_pack_index(zf)
+        except ValueError as e:
+            print_error(str(e))
+            return
+
+        for skill_name in expand_skill_selectors(skill_names, lambda: sorted(index["skills"])):
+            dest_path = PROJECT_SKILLS_DIR / skill_name
+            if skill_name not in index["skills"]:
+                print_error(f"Skill '{skill_name}' not found in archive.")
+                continue
+            if dest_path.exists() or dest_path.is_symlink():
+                print_warning(f"Skill '{skill_name}' is already installed in this project.")
+                continue
+
+            print_info(f"Installing {skill_name} from archive...")
+            try:
+                ensure_project_dir()
+                extract_pack_skill(zf, index, skill_name, dest_path)
+                record_copied_install(skill_name, cache, manifest)
+                print_success(f"Installed {skill_name} (Local Directory)")
+            except (OSError, ValueError) as e:
+                shutil.rmtree(dest_path, ignore_errors=True)
+                print_error(f"Installation failed: {e}")
+
+    save_manifest(manifest)
+    save_hash_cache(cache)
+
+# --- Interactive Picker ---
+
+class IncrementalFilter:
+    """
+    As-you-type filtering with the same matching rules as `search`
+    (case-insensitive substring, or substring after stripping symbols).
+    Results for each query prefix are kept on a stack: extending the query only
+    rescans the previous result set, and backspace pops back to a cached one.
+    """
+    def __init__(self, names: List[str]):
+        self.names = names
+        self.lowered = [n.lower() for n in names]
+        self.normalized = [normalize_name(n) for n in names]
+        self.stack = [("", list(range(len(names))))]
+
+    def matches(self, index: int, query: str, norm_query: str) -> bool:
+        return query in self.lowered[index] or (bool(norm_query) and norm_query in self.normalized[index])
+
+    def update(self, query: str) -> List[int]:
+        """Return the indices of the names matching query, in catalog order."""
+        query = query.lower()
+        while len(self.stack) > 1 and not query.startswith(self.stack[-1][0]):
+            self.stack.pop()
+        base_query, base = self.stack[-1]
+        if query == base_query:
+            return base
+
+        # A symbol-only query matches fewer names than its extensions can (no fuzzy
+        # branch), so it cannot serve as a base; rescan everything instead
+        if base_query and not normalize_name(base_query):
+            base = self.stack[0][1]
+        norm_query = normalize_name(query)
+        result = [i for i in base if self.matches(i, query, norm_query)]
+        self.stack.append((query, result))
+        return result
+
+def run_picker(screen, names: List[str], descriptions: dict, installed: set) -> Optional[set]:
+    """
+    curses main loop. Returns the set of names whose state should flip
+    (install if missing, uninstall if installed), or None if cancelled.
+    Only the visible rows are drawn, so each keystroke costs one filter pass.
+    """
+    import curses
+    try:
+        curses.curs_set(0)
+    except curses.error:
+        pass
+    flt = IncrementalFilter(names)
+    query = ""
+    visible = flt.update(query)
+    selected = set()
+    cursor = top = 0
+
+    while True:
+        height, width = screen.getmaxyx()
+        rows = max(1, height - 2)
+        cursor = min(cursor, max(0, len(visible) - 1))
+        top = min(max(top, cursor - rows + 1), cursor)
+
+        screen.erase()
+        header = f"Search: {query}"
+        status = f"{len(visible)}/{len(names)}  {len(selected)} selected  [space] toggle  [enter] apply  [esc] cancel"
+        screen.addnstr(0, 0, header, width - 1, curses.A_BOLD)
+        for row, index in enumerate(visible[top:top + rows]):
+            name = names[index]
+            mark = "   "
+            if name in selected:
+                mark = "[-]" if name in installed else "[+]"
+            elif name in installed:
+                mark = " * "
+            line = f"{mark} {name}"
+            if descriptions.get(name):
+                line += f"  - {descriptions[name]}"
+            attr = curses.A_REVERSE if top + row == cursor else curses.A_NORMAL
+            screen.addnstr(row + 1, 0, line, width - 1, attr)
+        screen.addnstr(height - 1, 0, status, width - 1, curses.A_DIM)
+        screen.refresh()
+
+        try:
+            key = screen.get_wch()
+        except KeyboardInterrupt:
+            return None
+
+        if key in ("\x1b",):
+            return None
+        if key in ("\n", "\r", curses.KEY_ENTER):
+            return selected
+        if key == curses.KEY_UP:
+            cursor = max(0, cursor - 1)
+        elif key == curses.KEY_DOWN:
+            cursor += 1
+        elif key == curses.KEY_PPAGE:
+            cursor = max(0, cursor - rows)
+        elif key == curses.KEY_NPAGE:
+            cursor += rows
+        elif key == " ":
+            if visible:
+                selected ^= {names[visible[cursor]]}
+        elif key in (curses.KEY_BACKSPACE, "\b", "\x7f"):
+            if query:
+                query = query[:-1]
+                visible = flt.update(query)
+                cursor = top = 0
+        elif isinstance(key, str) and key.isprintable():
+            query += key
+            visible = flt.update(query)
+            cursor = top = 0
+
+def pick_skills():
+    """Interactive picker: filter the global catalog as you type, then install/uninstall the selection."""
+    if not sys.stdin.isatty() or not sys.stdout.isatty():
+        print_error("pick needs an interactive terminal; use 'search' and 'install' instead.")
+        return
+    names = sorted(get_skill_index())
+    if not names:
+        print_error("No skills found in the skill sources.")
+        return
+
+    import curses
+    catalog = load_catalog()
+    descriptions = {
+        name: entry["meta"].get("description", "")
+        for name, entry in catalog["skills"].items() if "meta" in entry
+    }
+    installed = set(get_installed_names(PROJECT_SKILLS_DIR))
+
+    selection = curses.wrapper(run_picker, names, descriptions, installed)
+    if not selection:
+        print_info("Nothing selected.")
+        return
+
+    to_install = sorted(selection - installed)
+    to_uninstall = sorted(selection & installed)
+    if to_uninstall:
+        uninstall_skill(to_uninstall)
+    if to_install:
+        install_skill(to_install)
+
+# --- Shell Completion ---
+
+def get_completion_sources() -> List[Path]:
+    """Everything the completion names are derived from (directory mtimes track added/removed skills)."""
+    return get_skill_sources() + [WORKFLOWS_FILE] + get_bundle_sources()
+
+def rebuild_completion_cache() -> List[str]:
+    """Write the sorted 'kind<TAB>name' completion file and return its entry lines."""
+    sources = get_completion_sources()
+    visited = {}
+    bundle_names = [name for name, _ in iter_bundles(get_bundle_sources(), visited)]
+    lines = sorted(
+        [f"skill\t{n}" for n in get_skill_index()]
+        + [f"bundle\t{n}" for n in bundle_names]
+        + [f"workflow\t{n}" for n in parse_workflows()]
+    )
+    included = [p for k, p in visited.items() if k not in {os.path.abspath(s) for s in sources}]
+    header = "# " + json.dumps([[str(p), file_stamp(p)] for p in sources + included])
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_path = CACHE_DIR / (COMPLETION_FILENAME + f".{os.getpid()}.tmp")
+        tmp_path.write_text("\n".join([header] + lines), encoding='utf-8')
+        os.replace(tmp_path, CACHE_DIR / COMPLETION_FILENAME)
+    except OSError:
+        pass
+    return lines
+
+def load_completion_entries() -> List[str]:
+    """
+    Read the completion file; it is rebuilt only when one of its sources changed
+    (checked with one stat per source, without loading the catalog).
+    """
+    try:
+        text = (CACHE_DIR / COMPLETION_FILENAME).read_text(encoding='utf-8')
+    except OSError:
+        return rebuild_completion_cache()
+
+    header, _, body = text.partition("\n")
+    try:
+        files = json.loads(header[2:])
+    except ValueError:
+        return rebuild_completion_cache()
+    if not stamps_match(files, get_completion_sources()):
+        return rebuild_completion_cache()
+    return body.split("\n") if body else []
+
+def complete_names(kind: str, prefix: str) -> List[str]:
+    """Names of the given kind starting with prefix, via binary search over the sorted cache."""
+    if kind == "installed":
+        return [n for n in get_installed_names(PROJECT_SKILLS_DIR) if n.startswith(prefix)]
+
+    entries = load_completion_entries()
+    key = f"{kind}\t{prefix}"
+    start = bisect.bisect_left(entries, key)
+    matches = []
+    for line in itertools.islice(entries, start, None):
+        if not line.startswith(key):
+            break
+        matches.append(line[len(kind) + 1:])
+    return matches
+
+def get_command_tree(parser: argparse.ArgumentParser) -> dict:
+    """
+    Walk the argparse tree: { 'options': [...], 'commands': { name: subtree } }.
+    Each subtree has the same shape; leaves have an empty 'commands' dict.
+    """
+    tree = {"options": [], "commands": {}}
+    for action in parser._actions:
+        if isinstance(action, argparse._SubParsersAction):
+            for name, subparser in action.choices.items():
+                if not name.startswith('__'):
+                    tree["commands"][name] = get_command_tree(subparser)
+        else:
+            tree["options"].extend(o for o in action.option_strings if o.startswith('--') or len(action.option_strings) == 1)
+    return tree
+
+def generate_bash_completion(tree: dict, prog: str, command: str) -> str:
+    """Bash completion function dispatching on the first two non-option words."""
+    func = "_" + re.sub(r'\W', '_', prog)
+    noun_cases = []
+    for noun, sub in tree["commands"].items():
+        opts = " ".join(sub["options"])
+        if sub["commands"]:
+            verb_cases = []
+            for verb, leaf in sub["commands"].items():
+                kind = COMPLETION_KINDS.get(f"{noun} {verb}", "")
+                verb_cases.append(f'                {verb}) kind="{kind}"; opts="{" ".join(leaf["options"])}" ;;')
+            noun_cases.append(
+                f'        {noun})\n'
+                f'            if [ -z "$verb" ]; then choices="{" ".join(sub["commands"])}"; opts="{opts}"; fi\n'
+                f'            case "$verb" in\n' + "\n".join(verb_cases) + '\n            esac ;;'
+            )
+        else:
+            kind = COMPLETION_KINDS.get(noun, "")
+            noun_cases.append(f'        {noun}) kind="{kind}"; opts="{opts}" ;;')
+
+    return f"""# bash completion for {prog} (generated by: {prog} completion bash)
+{func}() {{
+    local cur="${{COMP_WORDS[COMP_CWORD]}}"
+    local noun="" verb="" choices="" kind="" opts="" i w
+    for ((i=1; i<COMP_CWORD; i++)); do
+        w="${{COMP_WORDS[i]}}"
+        [[ "$w" == -* ]] && continue
+        if [ -z "$noun" ]; then noun="$w"; elif [ -z "$verb" ]; then verb="$w"; fi
+    done
+    case "$noun" in
+        "") choices="{" ".join(tree["commands"])}"; opts="{" ".join(tree["options"])}" ;;
+{chr(10).join(noun_cases)}
+    esac
+    if [[ "$cur" == -* ]]; then
+        COMPREPLY=( $(compgen -W "$opts" -- "$cur") )
+    elif [ -n "$choices" ]; then
+        COMPREPLY=( $(compgen -W "$choices" -- "$cur") )
+    elif [ -n "$kind" ]; then
+        local IFS=$'\\n' name
+        COMPREPLY=()
+        for name in $({command} __complete "$kind" "$cur" 2>/dev/null); do
+            COMPREPLY+=( "$(printf '%q' "$name")" )
+        done
+    fi
+}}
+complete -F {func} {prog}
+"""
+
+def generate_fish_completion(tree: dict, prog: str, command: str) -> str:
+    """Fish completions: one 'complete' line per command level plus dynamic names."""
+    lines = [f"# fish completion for {prog} (generated by: {prog} completion fish)"]
+    nouns = " ".join(tree["commands"])
+    lines.append(f"complete -c {prog} -f -n '__fish_use_subcommand' -a '{nouns}'")
+    for noun, sub in tree["commands"].items():
+        cond = f"__fish_seen_subcommand_from {noun}"
+        for opt in sub["options"]:
+            lines.append(f"complete -c {prog} -f -n '{cond}' -l {opt.lstrip('-')}")
+        if sub["commands"]:
+            verbs = " ".join(sub["commands"])
+            lines.append(f"complete -c {prog} -f -n '{cond}; and not __fish_seen_subcommand_from {verbs}' -a '{verbs}'")
+            for verb in sub["commands"]:
+                kind = COMPLETION_KINDS.get(f"{noun} {verb}")
+                if kind:
+                    lines.append(f"complete -c {prog} -f -n '{cond}; and __fish_seen_subcommand_from {verb}' "
+                                 f"-a '({command} __complete {kind} (commandline -ct))'")
+        elif COMPLETION_KINDS.get(noun):
+            lines.append(f"complete -c {prog} -f -n '{cond}' "
+                         f"-a '({command} __complete {COMPLETION_KINDS[noun]} (commandline -ct))'")
+    return "\n".join(lines) + "\n"
+
+def print_completion_script(shell: str, prog: str):
+    """Print a completion script for bash, zsh or fish."""
+    command = f"{sys.executable} {os.path.abspath(__file__)}"
+    tree = get_command_tree(build_parser())
+    if shell == "fish":
+        sys.stdout.write(generate_fish_completion(tree, prog, command))
+        return
+    script = generate_bash_completion(tree, prog, command)
+    if shell == "zsh":
+        script = "autoload -U +X compinit && compinit\nautoload -U +X bashcompinit && bashcompinit\n" + script
+    sys.stdout.write(script)
 
 # --- Main CLI ---
 
-def main():
+def build_parser() -> argparse.ArgumentParser:
+    """Build the full argparse tree (also used to generate shell completion scripts)."""
     parser = argparse.ArgumentParser(
         description="""
 Skills Manager CLI for Antigravity
@@ -693,6 +2972,9 @@ Examples:
   # Install specific skills (space separated):
   python skills_manager.py install concise-planning systematic-debugging
 
+  # Install every skill matching a glob or regex selector in one batch:
+  python skills_manager.py install 'test*' 're:^aws-'
+
   # Install a curated bundle of skills:
   python skills_manager.py bundle install "Essentials"
 
@@ -702,11 +2984,20 @@ Examples:
   # Remove skills from your project:
   python skills_manager.py uninstall concise-planning
 
+  # Pull the latest skills into the global repository:
+  python skills_manager.py update
+
+  # Pack a bundle into a single archive for offline hosts, then install from it:
+  python skills_manager.py pack skills.zip --bundle "Essentials"
+  python skills_manager.py install --from skills.zip concise-planning
+
   # See help for a specific command:
   python skills_manager.py bundle --help
 """,
         formatter_class=argparse.RawDescriptionHelpFormatter
     )
+    parser.add_argument("--timings", action="store_true", help="Print a per-phase timing breakdown to stderr")
+    parser.add_argument("--profile", metavar="OUT.prof", type=Path, help="Run under cProfile and write stats to this file")
     subparsers = parser.add_subparsers(dest="noun", help="Available commands")
 
     # --- Skill Commands (Implicit/Top-level) ---
@@ -714,6 +3005,7 @@ Examples:
     # list (Project skills by default, global with flag)
     list_parser = subparsers.add_parser("list", help="List skills")
     list_parser.add_argument("-g", "--global", dest="is_global", action="store_true", help="List available global skills")
+    list_parser.add_argument("--sizes", action="store_true", help="Show SKILL.md bytes, lines and approximate tokens")
     
     # search
     search_parser = subparsers.add_parser("search", help="Search for global skills")
@@ -721,15 +3013,62 @@ Examples:
 
     # install
     install_parser = subparsers.add_parser("install", help="Install skill(s) to current project")
-    install_parser.add_argument("skill_names", nargs='+', help="Name(s) of the skill to install")
+    install_parser.add_argument("skill_names", nargs='*', help="Name(s) or selectors ('test*', 're:^aws-') of the skills to install")
+    install_parser.add_argument("--from-file", metavar="FILE", help="Read additional selectors from a file, one per line ('-' for stdin)")
+    install_parser.add_argument("--from", dest="archive", type=Path, help="Install copies from a packed archive instead of the global repo")
+    install_parser.add_argument("--copy", action="store_true", help="Copy the skill directory instead of symlinking it")
 
     # uninstall
     uninstall_parser = subparsers.add_parser("uninstall", help="Remove skill(s) from current project")
-    uninstall_parser.add_argument("skill_names", nargs='+', help="Name(s) of the skill to remove")
+    uninstall_parser.add_argument("skill_names", nargs='*', help="Name(s) or selectors ('test*', 're:^aws-') of the skills to remove")
+    uninstall_parser.add_argument("--from-file", metavar="FILE", help="Read additional selectors from a file, one per line ('-' for stdin)")
+    uninstall_parser.add_argument("--wait", action="store_true", help="Delete copied skills before returning instead of in the background")
 
     # clear
     clear_parser = subparsers.add_parser("clear", help="Remove all skills from current project")
     clear_parser.add_argument("-f", "--force", action="store_true", help="Skip confirmation prompt")
+    clear_parser.add_argument("--wait", action="store_true", help="Delete copied skills before returning instead of in the background")
+
+    # status / upgrade
+    subparsers.add_parser("status", help="Show whether installed skills are up to date, modified or outdated")
+    upgrade_parser = subparsers.add_parser("upgrade", help="Re-copy changed files of outdated copied skills")
+    upgrade_parser.add_argument("skill_names", nargs='*', help="Skill(s) or selectors to upgrade (default: all copied skills)")
+    upgrade_parser.add_argument("-f", "--force", action="store_true", help="Also overwrite locally modified copies")
+
+    # sources
+    subparsers.add_parser("sources", help="Show skill sources in priority order")
+
+    # pick
+    subparsers.add_parser("pick", help="Interactively filter, select and install/uninstall skills")
+
+    # completion
+    completion_parser = subparsers.add_parser("completion", help="Print a shell completion script")
+    completion_parser.add_argument("shell", choices=["bash", "zsh", "fish"], help="Target shell")
+    completion_parser.add_argument("--prog", default="skills_manager.py", help="Command name to complete (e.g. your alias)")
+
+    # budget
+    budget_parser = subparsers.add_parser("budget", help="Show the context size of installed skills")
+    budget_parser.add_argument("--max-tokens", type=int, help="Token budget; suggests skills to drop when exceeded")
+
+    # reindex
+    reindex_parser = subparsers.add_parser("reindex", help="Build the content index of all global skills in parallel")
+    reindex_parser.add_argument("-j", "--jobs", type=int, default=None, help="Worker processes (default: CPU count)")
+    reindex_parser.add_argument("--force", action="store_true", help="Re-index skills that are already up to date")
+
+    # update
+    subparsers.add_parser("update", help="Pull the global repository and refresh changed entries")
+
+    # pack
+    pack_parser = subparsers.add_parser("pack", help="Pack skills, bundles and workflows into a single archive")
+    pack_parser.add_argument("archive", type=Path, help="Output archive path (.zip)")
+    pack_parser.add_argument("skill_names", nargs='*', help="Skill(s) to include (default: all, unless --bundle/--workflow is given)")
+    pack_parser.add_argument("-b", "--bundle", dest="bundles", action="append", default=[], help="Include all skills of a bundle")
+    pack_parser.add_argument("-w", "--workflow", dest="workflows", action="append", default=[], help="Include all skills of a workflow")
+
+    # unpack
+    unpack_parser = subparsers.add_parser("unpack", help="Extract a packed archive into a repository layout")
+    unpack_parser.add_argument("archive", type=Path, help="Archive created by 'pack'")
+    unpack_parser.add_argument("dest", type=Path, help="Destination directory")
 
     # --- Bundle Commands ---
     # Create a subparser for 'bundle'
@@ -746,10 +3085,12 @@ Examples:
     # bundle install <name>
     bi_parser = bundle_subparsers.add_parser("install", help="Install all skills in a bundle")
     bi_parser.add_argument("bundle_names", nargs='+', help="Name(s) (or part of name) of the bundle")
+    bi_parser.add_argument("--max-tokens", type=int, help="Refuse to install if the project would exceed this many tokens")
 
     # bundle uninstall <name>
     bu_parser = bundle_subparsers.add_parser("uninstall", help="Uninstall all skills in a bundle")
     bu_parser.add_argument("bundle_names", nargs='+', help="Name(s) (or part of name) of the bundle")
+    bu_parser.add_argument("--wait", action="store_true", help="Delete copied skills before returning instead of in the background")
 
     # --- Workflow Commands ---
     workflow_parser = subparsers.add_parser("workflow", help="Manage workflows")
@@ -761,60 +3102,172 @@ Examples:
     # workflow search <query>
     ws_parser = workflow_subparsers.add_parser("search", help="Search workflows")
     ws_parser.add_argument("query", help="Search query")
+    ws_parser.add_argument("--limit", type=int, default=WORKFLOW_SEARCH_LIMIT, help=f"Show at most N results (default: {WORKFLOW_SEARCH_LIMIT})")
 
     # workflow install <name>
     wi_parser = workflow_subparsers.add_parser("install", help="Install skills from a workflow")
     wi_parser.add_argument("workflow_names", nargs='+', help="Name or ID of the workflow(s)")
+    wi_parser.add_argument("--step", type=int, help="Install only the skills of this step (1-based) and track it")
+    wi_parser.add_argument("--max-tokens", type=int, help="Refuse to install if the project would exceed this many tokens")
+
+    # workflow next / status
+    workflow_subparsers.add_parser("next", help="Swap to the skills of the next tracked workflow step")
+    workflow_subparsers.add_parser("status", help="Show the tracked workflow step")
 
     # workflow uninstall <name>
     wu_parser = workflow_subparsers.add_parser("uninstall", help="Uninstall skills from a workflow")
     wu_parser.add_argument("workflow_names", nargs='+', help="Name or ID of the workflow(s)")
+    wu_parser.add_argument("--wait", action="store_true", help="Delete copied skills before returning instead of in the background")
+
+    return parser
+
+def run_cli(argv: Optional[List[str]] = None):
+    parser = build_parser()
 
     # Arguments parsing
-    if len(sys.argv) == 1:
+    if argv is None:
+        argv = sys.argv[1:]
+    if not argv:
         parser.print_help(sys.stderr)
         sys.exit(1)
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     # Routing
     if args.noun == "list":
         if args.is_global:
-            list_global()
+            list_global(args.sizes)
         else:
-            list_project()
+            list_project(args.sizes)
     elif args.noun == "search":
         search_skills(args.query)
-    elif args.noun == "install":
-        install_skill(args.skill_names)
-    elif args.noun == "uninstall":
-        uninstall_skill(args.skill_names)
+    elif args.noun in ("install", "uninstall"):
+        selectors = list(args.skill_names)
+        if args.from_file:
+            try:
+                selectors.extend(read_selector_file(args.from_file))
+            except OSError as e:
+                print_error(f"Cannot read selectors: {e}")
+                sys.exit(1)
+        if not selectors:
+            parser.error(f"{args.noun}: at least one skill name or selector is required")
+
+        if args.noun == "uninstall":
+            uninstall_skill(selectors, args.wait)
+        elif args.archive:
+            install_skill_from_archive(args.archive, selectors)
+        elif args.copy:
+            install_skill_copy(selectors)
+        else:
+            install_skill(selectors)
     elif args.noun == "clear":
-        clear_all_skills(args.force)
+        clear_all_skills(args.force, args.wait)
+    elif args.noun == "status":
+        show_status()
+    elif args.noun == "upgrade":
+        upgrade_skills(args.skill_names, args.force)
+    elif args.noun == "sources":
+        list_sources()
+    elif args.noun == "pick":
+        pick_skills()
+    elif args.noun == "completion":
+        print_completion_script(args.shell, args.prog)
+    elif args.noun == "budget":
+        show_budget(args.max_tokens)
+    elif args.noun == "reindex":
+        reindex(args.jobs, args.force)
+    elif args.noun == "update":
+        update_global_repo()
+    elif args.noun == "pack":
+        pack_skills(args.archive, args.skill_names, args.bundles, args.workflows)
+    elif args.noun == "unpack":
+        unpack_archive(args.archive, args.dest)
     elif args.noun == "bundle":
         if args.verb == "list":
             list_bundles()
         elif args.verb == "search":
             search_bundles(args.query)
         elif args.verb == "install":
-            install_bundle(args.bundle_names)
+            install_bundle(args.bundle_names, args.max_tokens)
         elif args.verb == "uninstall":
-            uninstall_bundle(args.bundle_names)
+            uninstall_bundle(args.bundle_names, args.wait)
         else:
-            bundle_parser.print_help()
+            parser.parse_args(["bundle", "--help"])
     elif args.noun == "workflow":
         if args.verb == "list":
             list_workflows()
         elif args.verb == "search":
-            search_workflows(args.query)
+            search_workflows(args.query, args.limit)
         elif args.verb == "install":
-            install_workflow(args.workflow_names)
+            if args.step is not None:
+                if len(args.workflow_names) != 1:
+                    parser.error("workflow install --step accepts exactly one workflow")
+                install_workflow_step(args.workflow_names[0], args.step, args.max_tokens)
+            else:
+                install_workflow(args.workflow_names, args.max_tokens)
+        elif args.verb == "next":
+            next_workflow_step()
+        elif args.verb == "status":
+            show_workflow_status()
         elif args.verb == "uninstall":
-            uninstall_workflow(args.workflow_names)
+            uninstall_workflow(args.workflow_names, args.wait)
         else:
             parser.parse_args(["workflow", "--help"])
     else:
         parser.print_help()
 
+    # Copied skills removed by bundle/workflow commands are deleted in the background
+    empty_trash()
+
+def main():
+    """Entry point: applies the --timings / --profile instrumentation around run_cli()."""
+    # Fast path for shell completion: no argparse, no instrumentation
+    if len(sys.argv) >= 3 and sys.argv[1] == "__complete":
+        prefix = sys.argv[3] if len(sys.argv) > 3 else ""
+        for name in complete_names(sys.argv[2], prefix):
+            print(name)
+        return
+    if len(sys.argv) == 3 and sys.argv[1] == "__purge-trash":
+        purge_trash(Path(sys.argv[2]))
+        return
+
+    pre_parser = argparse.ArgumentParser(add_help=False)
+    pre_parser.add_argument("--timings", action="store_true")
+    pre_parser.add_argument("--profile", type=Path)
+    opts, rest = pre_parser.parse_known_args()
+
+    json_target = os.environ.get(TIMINGS_JSON_ENV)
+    command = " ".join(a for a in rest if not a.startswith('-'))[:80] or "help"
+
+    if opts.timings or json_target:
+        TIMER.enable()
+        sys.stdout = TimedStream(sys.stdout)
+
+    profiler = None
+    if opts.profile:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+    try:
+        run_cli(rest)
+    except LockTimeout as e:
+        print_error(f"{e} (another skills_manager invocation is running; see {LOCK_TIMEOUT_ENV})")
+        sys.exit(1)
+    finally:
+        if profiler:
+            profiler.disable()
+            profiler.dump_stats(str(opts.profile))
+            print_info(f"Profile written to {opts.profile} (inspect with: python -m pstats {opts.profile})")
+        if TIMER.enabled:
+            report = TIMER.report()
+            TIMER.disable()
+            sys.stdout.flush()
+            sys.stdout = sys.stdout.stream
+            if opts.timings:
+                print_timings(report, command)
+            if json_target:
+                emit_timings_json(report, command, json_target)
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,235 @@
+"""
+Scale harness: runs commands against generated repositories of increasing size and
+checks how their filesystem call counts and tracemalloc peaks grow.
+
+    python tests/scale_harness.py                    # default sizes, os-call shim
+    python tests/scale_harness.py --sizes 100 1000 10000 --strace
+
+Each scenario declares a complexity budget per metric as a growth exponent
+(1 = O(n)) and, for filesystem calls, a maximum number of calls per skill.
+The cost at size 0 is subtracted first, so fixed start-up costs do not hide growth.
+Exits with status 1 if any budget is exceeded.
+"""
+import argparse
+import json
+import math
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import skills_manager
+
+BUNDLE_NAME = "Scale"
+DEFAULT_SIZES = [100, 400, 1600]
+
+# Allowed slack on growth exponents (measurement noise, small-n effects)
+EXPONENT_TOLERANCE = 0.25
+
+# { scenario: { metric: (max growth exponent, max per-skill cost or None) } }
+COMPLEXITY_BUDGETS = {
+    "list_project": {"fs_calls": (1, 4), "peak_bytes": (1, None)},
+    "install_bundle_single": {"fs_calls": (1, 3), "peak_bytes": (1, None)},
+    "clear_all_skills": {"fs_calls": (1, 3), "peak_bytes": (1, None)},
+}
+
+# strace syscalls counted as filesystem work
+STRACE_FILTER = "trace=%file,getdents64"
+
+# --- Repository generation ---
+
+def generate_repo(root: Path, n: int):
+    """Global repo with n skills, one bundle and one workflow listing all of them."""
+    skills_dir = root / "global" / "skills"
+    skills_dir.mkdir(parents=True)
+    names = [f"skill-{i:06d}" for i in range(n)]
+    for name in names:
+        (skills_dir / name).mkdir()
+        (skills_dir / name / "SKILL.md").write_text(f"---\nname: {name}\n---\n# {name}\n", encoding="utf-8")
+
+    bundles = [f"### {BUNDLE_NAME}"] + [f"- [`{name}`](../skills/{name}/)" for name in names]
+    (root / "global" / "BUNDLES.md").write_text("\n".join(bundles) + "\n", encoding="utf-8")
+    workflows = {"workflows": [{"id": "scale", "name": "Scale", "steps": [{"title": "All", "recommendedSkills": names}]}]}
+    (root / "global" / "workflows.json").write_text(json.dumps(workflows), encoding="utf-8")
+    (root / "project" / ".agent").mkdir(parents=True)
+    return names
+
+def configure(root: Path) -> dict:
+    """Point the module at a generated repository (and a private cache); returns the previous settings."""
+    settings = {
+        "GLOBAL_SKILLS_REPO": root / "global" / "skills",
+        "BUNDLES_FILE": root / "global" / "BUNDLES.md",
+        "WORKFLOWS_FILE": root / "global" / "workflows.json",
+        "PROJECT_SKILLS_DIR": root / "project" / ".agent" / "skills",
+        "CACHE_DIR": root / "cache",
+    }
+    previous = {name: getattr(skills_manager, name) for name in settings}
+    for name, value in settings.items():
+        setattr(skills_manager, name, value)
+    return previous
+
+def link_all(root: Path, names):
+    """Pre-populate the project with one symlink per skill (setup, not measured)."""
+    project = root / "project" / ".agent" / "skills"
+    project.mkdir(parents=True, exist_ok=True)
+    for name in names:
+        os.symlink(root / "global" / "skills" / name, project / name)
+
+# --- Scenarios: (setup, run) ---
+
+def setup_installed(root, names):
+    link_all(root, names)
+    skills_manager.parse_bundles()  # warm the catalog like a repeated invocation
+
+def setup_warm_catalog(root, names):
+    skills_manager.parse_bundles()
+
+SCENARIOS = {
+    "list_project": (setup_installed, lambda: skills_manager.list_project()),
+    "install_bundle_single": (setup_warm_catalog, lambda: skills_manager.install_bundle_single(BUNDLE_NAME)),
+    "clear_all_skills": (setup_installed, lambda: skills_manager.clear_all_skills(force=True, wait=True)),
+}
+
+# --- Measurement ---
+
+def run_scenario(scenario: str, root: Path):
+    """Run a prepared scenario in this process, silencing its output."""
+    stdout = sys.stdout
+    sys.stdout = open(os.devnull, 'w', encoding='utf-8')
+    try:
+        SCENARIOS[scenario][1]()
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+
+def measure_in_process(scenario: str, root: Path) -> dict:
+    """Count filesystem calls with the os-call shim and record the tracemalloc peak."""
+    calls = {}
+    counter = skills_manager.OsCallCounter(lambda name: calls.__setitem__(name, calls.get(name, 0) + 1))
+    tracemalloc.start()
+    counter.install()
+    start = time.perf_counter()
+    try:
+        run_scenario(scenario, root)
+    finally:
+        elapsed = time.perf_counter() - start
+        counter.uninstall()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return {"fs_calls": sum(calls.values()), "calls": calls, "peak_bytes": peak, "seconds": elapsed}
+
+def measure_with_strace(scenario: str, root: Path) -> dict:
+    """Count real syscalls of a child process running only the scenario (setup happens here)."""
+    summary = root / "strace.txt"
+    child = [sys.executable, os.path.abspath(__file__), "--child", scenario, str(root)]
+    start = time.perf_counter()
+    proc = subprocess.run(["strace", "-f", "-c", "-e", STRACE_FILTER, "-o", str(summary)] + child,
+                          capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(f"strace run failed: {proc.stderr.strip()}")
+
+    calls = {}
+    for line in summary.read_text(encoding="utf-8").splitlines():
+        # % time  seconds  usecs/call  calls  [errors]  syscall
+        fields = line.split()
+        if len(fields) >= 5 and re.match(r"^[\d.]+$", fields[0]) and fields[-1] != "total":
+            calls[fields[-1]] = int(fields[3])
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    return {"fs_calls": sum(calls.values()), "calls": calls, "peak_bytes": result["peak_bytes"], "seconds": elapsed}
+
+def measure(scenario: str, n: int, use_strace: bool = False) -> dict:
+    """Generate a repository of size n, prepare the scenario and measure one run."""
+    root = Path(tempfile.mkdtemp(prefix=f"skills-scale-{n}-"))
+    previous = configure(root)
+    try:
+        names = generate_repo(root, n)
+        SCENARIOS[scenario][0](root, names)
+        if use_strace:
+            return measure_with_strace(scenario, root)
+        return measure_in_process(scenario, root)
+    finally:
+        for name, value in previous.items():
+            setattr(skills_manager, name, value)
+        shutil.rmtree(root, ignore_errors=True)
+
+# --- Budgets ---
+
+def growth_exponent(sizes, values) -> float:
+    """Largest log-log slope between consecutive sizes, after subtracting the size-0 cost."""
+    base = values[0]
+    worst = 0.0
+    points = [(n, v - base) for n, v in zip(sizes[1:], values[1:])]
+    for (n1, v1), (n2, v2) in zip(points, points[1:]):
+        if v1 > 0 and v2 > 0:
+            worst = max(worst, math.log(v2 / v1) / math.log(n2 / n1))
+    return worst
+
+def check_budgets(scenario: str, sizes, results) -> list:
+    """Return a list of human-readable budget violations for one scenario."""
+    failures = []
+    for metric, (max_exponent, max_per_item) in COMPLEXITY_BUDGETS[scenario].items():
+        values = [r[metric] for r in results]
+        exponent = growth_exponent(sizes, values)
+        if exponent > max_exponent + EXPONENT_TOLERANCE:
+            failures.append(f"{scenario}: {metric} grows as n^{exponent:.2f} (budget n^{max_exponent})")
+        if max_per_item is not None and sizes[-1]:
+            per_item = (values[-1] - values[0]) / sizes[-1]
+            if per_item > max_per_item:
+                failures.append(f"{scenario}: {per_item:.1f} {metric} per skill (budget {max_per_item})")
+    return failures
+
+def run_harness(sizes, scenarios=None, use_strace: bool = False, out=sys.stdout):
+    """Measure every scenario at size 0 plus the given sizes; returns (results, failures)."""
+    sizes = [0] + sorted(s for s in sizes if s > 0)
+    all_results = {}
+    failures = []
+    for scenario in scenarios or SCENARIOS:
+        results = [measure(scenario, n, use_strace) for n in sizes]
+        all_results[scenario] = results
+        out.write(f"\n{scenario}\n")
+        out.write(f"  {'n':>8}{'FS calls':>12}{'per skill':>11}{'peak KiB':>11}{'ms':>10}\n")
+        for n, r in zip(sizes, results):
+            per_item = (r["fs_calls"] - results[0]["fs_calls"]) / n if n else 0
+            out.write(f"  {n:>8}{r['fs_calls']:>12}{per_item:>11.2f}{r['peak_bytes'] / 1024:>11.1f}{r['seconds'] * 1000:>10.1f}\n")
+        failures.extend(check_budgets(scenario, sizes, results))
+    return all_results, failures
+
+def main():
+    parser = argparse.ArgumentParser(description="Check how commands scale with the number of skills")
+    parser.add_argument("--sizes", type=int, nargs='+', default=DEFAULT_SIZES, help="Repository sizes to generate")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="Run only these scenarios")
+    parser.add_argument("--strace", action="store_true", help="Count real syscalls with strace instead of the os-call shim")
+    parser.add_argument("--child", nargs=2, metavar=("SCENARIO", "ROOT"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        # Child of measure_with_strace(): run the prepared scenario and report the memory peak
+        scenario, root = args.child
+        configure(Path(root))
+        tracemalloc.start()
+        run_scenario(scenario, Path(root))
+        print(json.dumps({"peak_bytes": tracemalloc.get_traced_memory()[1]}))
+        return
+
+    if args.strace and not shutil.which("strace"):
+        print("strace not found; using the os-call shim instead", file=sys.stderr)
+        args.strace = False
+
+    _, failures = run_harness(args.sizes, args.scenario, args.strace)
+    if failures:
+        print("\nComplexity budget exceeded:", file=sys.stderr)
+        for failure in failures:
+            print(f"  {failure}", file=sys.stderr)
+        sys.exit(1)
+    print("\nAll scenarios within their complexity budgets.")
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,7 @@ import shutil
 import sys
 import importlib
 import json
+import subprocess
 
 # Add project root to sys.path so we can import the module
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -69,6 +70,7 @@ def mock_dirs(tmp_path, monkeypatch):
     monkeypatch.setattr(skills_manager, "PROJECT_SKILLS_DIR", project_repo)
     monkeypatch.setattr(skills_manager, "BUNDLES_FILE", bundles_file)
     monkeypatch.setattr(skills_manager, "WORKFLOWS_FILE", workflows_file)
+    monkeypatch.setattr(skills_manager, "CACHE_DIR", tmp_path / "cache")
 
     return global_repo, project_repo, bundles_file, workflows_file
 
@@ -189,6 +191,27 @@ def test_uninstall_bundle(mock_dirs):
     assert not (project_repo / "skill-alpha").exists()
     assert not (project_repo / "skill-beta").exists()
 
+def test_bundle_and_workflow_uninstalls_are_batched(mock_dirs, monkeypatch, capsys):
+    global_repo, project_repo, _, _ = mock_dirs
+    skills_manager.install_skill(["skill-alpha"])
+    shutil.copytree(global_repo / "skill-beta", project_repo / "skill-beta")
+    batches = []
+    batch = skills_manager.uninstall_skill_batch
+    monkeypatch.setattr(skills_manager, "uninstall_skill_batch",
+                        lambda names, announce=False: (batches.append(list(names)), batch(names, announce)))
+    monkeypatch.setattr(skills_manager, "uninstall_skill_single", lambda name: pytest.fail("per-skill uninstall"))
+
+    skills_manager.run_cli(["bundle", "uninstall", "Starter", "--wait"])
+    assert batches == [["skill-alpha", "skill-beta"]]
+    assert "  Uninstalling skill-beta..." in capsys.readouterr().out
+    assert list(project_repo.iterdir()) == []
+    assert list(skills_manager.get_trash_dir().iterdir()) == []  # --wait emptied the trash
+
+    skills_manager.install_skill(["skill-alpha", "skill-beta"])
+    skills_manager.run_cli(["workflow", "uninstall", "test-workflow", "--wait"])
+    assert batches[-1] == ["skill-alpha", "skill-beta"]
+    assert list(project_repo.iterdir()) == []
+
 def test_clear_all_skills(mock_dirs, monkeypatch):
     _, project_repo, _, _ = mock_dirs
     
@@ -229,3 +252,857 @@ def test_install_workflow(mock_dirs):
     
     assert (project_repo / "skill-alpha").exists()
     assert (project_repo / "skill-beta").exists()
+
+def test_bundle_and_workflow_installs_are_batched(mock_dirs, monkeypatch, capsys):
+    _, project_repo, _, _ = mock_dirs
+    batches = []
+    batch = skills_manager.install_skill_batch
+    monkeypatch.setattr(skills_manager, "install_skill_batch",
+                        lambda names, announce=False: (batches.append(list(names)), batch(names, announce)))
+
+    skills_manager.install_bundle(["Starter"])
+    (project_repo / "skill-beta").unlink()
+    skills_manager.install_workflow(["test-workflow"])
+    out = capsys.readouterr().out
+
+    assert batches == [["skill-alpha", "skill-beta"], ["skill-alpha", "skill-beta"]]
+    assert out.count("  Installing skill-alpha...") == 2
+    assert "Skill 'skill-alpha' is already installed" in out
+    assert (project_repo / "skill-beta").is_symlink()
+
+def test_parse_bundles_uses_catalog_cache(mock_dirs):
+    _, _, bundles_file, _ = mock_dirs
+
+    first = skills_manager.parse_bundles()
+    catalog = skills_manager.load_catalog()
+    assert catalog["bundles"]["data"] == first
+
+    # A modified file invalidates the cached entry
+    bundles_file.write_text("### New Pack\n- [`skill-alpha`](../skills/skill-alpha/)\n", encoding="utf-8")
+    assert list(skills_manager.parse_bundles()) == ["New Pack"]
+
+def git(cwd, *args):
+    subprocess.run(
+        ["git", "-c", "user.name=test", "-c", "user.email=test@example.com", *args],
+        cwd=cwd, check=True, capture_output=True,
+    )
+
+@pytest.fixture
+def git_repos(tmp_path, monkeypatch):
+    """
+    A bare 'upstream' repo, a global clone used by the tool and a second
+    clone used to push new commits upstream.
+    """
+    upstream = tmp_path / "upstream.git"
+    git(tmp_path, "init", "--bare", "-b", "main", str(upstream))
+
+    author = tmp_path / "author"
+    git(tmp_path, "clone", str(upstream), str(author))
+    git(author, "checkout", "-b", "main")
+    for name in ("skill-alpha", "skill-beta"):
+        (author / "skills" / name).mkdir(parents=True)
+        (author / "skills" / name / "SKILL.md").write_text(f"# {name}\n", encoding="utf-8")
+    (author / "docs").mkdir()
+    (author / "docs" / "BUNDLES.md").write_text("### Pack\n- [`skill-alpha`](../skills/skill-alpha/)\n", encoding="utf-8")
+    git(author, "add", "-A")
+    git(author, "commit", "-m", "initial")
+    git(author, "push", "-u", "origin", "main")
+
+    global_root = tmp_path / "global"
+    git(tmp_path, "clone", str(upstream), str(global_root))
+
+    project_repo = tmp_path / "project_skills"
+    project_repo.mkdir()
+
+    monkeypatch.setattr(skills_manager, "GLOBAL_REPO_ROOT", global_root)
+    monkeypatch.setattr(skills_manager, "GLOBAL_SKILLS_REPO", global_root / "skills")
+    monkeypatch.setattr(skills_manager, "BUNDLES_FILE", global_root / "docs" / "BUNDLES.md")
+    monkeypatch.setattr(skills_manager, "WORKFLOWS_FILE", global_root / "data" / "workflows.json")
+    monkeypatch.setattr(skills_manager, "PROJECT_SKILLS_DIR", project_repo)
+    monkeypatch.setattr(skills_manager, "CACHE_DIR", tmp_path / "cache")
+
+    return author, global_root, project_repo
+
+def test_classify_changed_paths(git_repos):
+    changes = skills_manager.classify_changed_paths([
+        "skills/skill-alpha/SKILL.md",
+        "skills/skill-beta/assets/a.png",
+        "docs/BUNDLES.md",
+        "README.md",
+    ])
+    assert changes["skills"] == {"skill-alpha", "skill-beta"}
+    assert changes["bundles"] is True
+    assert changes["workflows"] is False
+
+def test_update_global_repo(git_repos, capsys):
+    author, global_root, project_repo = git_repos
+
+    skills_manager.install_skill(["skill-alpha", "skill-beta"])
+    catalog = skills_manager.load_catalog()
+    catalog["skills"] = {"skill-alpha": {"cached": True}, "skill-beta": {"cached": True}}
+    skills_manager.save_catalog(catalog)
+    skills_manager.parse_bundles()
+
+    (author / "skills" / "skill-alpha" / "SKILL.md").write_text("# changed\n", encoding="utf-8")
+    git(author, "commit", "-am", "change alpha")
+    git(author, "push")
+    capsys.readouterr()
+
+    skills_manager.update_global_repo()
+    captured = capsys.readouterr()
+
+    assert (global_root / "skills" / "skill-alpha" / "SKILL.md").read_text(encoding="utf-8") == "# changed\n"
+    assert "Skills changed: 1" in captured.out
+    assert "1 installed project skills were updated" in captured.out
+    assert "skill-alpha" in captured.out
+
+    catalog = skills_manager.load_catalog()
+    assert "skill-alpha" not in catalog["skills"]
+    assert "skill-beta" in catalog["skills"]
+    assert "bundles" in catalog
+
+    skills_manager.update_global_repo()
+    assert "already up to date" in capsys.readouterr().out
+
+    # A renamed skill invalidates and reports its old name as well
+    git(author, "mv", "skills/skill-beta", "skills/skill-renamed")
+    git(author, "commit", "-m", "rename beta")
+    git(author, "push")
+    skills_manager.update_global_repo()
+    out = capsys.readouterr().out
+    assert "Skills changed: 2" in out
+    assert "skill-beta \033[93m(removed from global repo)" in out
+    assert "skill-beta" not in skills_manager.load_catalog()["skills"]
+
+def test_pack_and_install_from_archive(mock_dirs, tmp_path):
+    global_repo, project_repo, _, _ = mock_dirs
+    (global_repo / "skill-alpha" / "SKILL.md").write_text("# alpha\n", encoding="utf-8")
+    (global_repo / "skill-alpha" / "assets").mkdir()
+    (global_repo / "skill-alpha" / "assets" / "data.txt").write_text("data", encoding="utf-8")
+
+    archive = tmp_path / "skills.zip"
+    skills_manager.pack_skills(archive, [], ["Starter"], [])
+    assert archive.exists()
+
+    with skills_manager.zipfile.ZipFile(archive) as zf:
+        index = skills_manager.read_pack_index(zf)
+    assert sorted(index["skills"]) == ["skill-alpha", "skill-beta"]
+    assert '🚀 The "Starter" Pack' in index["bundles"]
+    assert "test-workflow" in index["workflows"]
+
+    skills_manager.install_skill_from_archive(archive, ["skill-alpha"])
+    installed = project_repo / "skill-alpha"
+    assert installed.is_dir() and not installed.is_symlink()
+    assert (installed / "assets" / "data.txt").read_text(encoding="utf-8") == "data"
+
+def test_unpack_archive(mock_dirs, tmp_path, monkeypatch):
+    global_repo, _, _, _ = mock_dirs
+    (global_repo / "skill-beta" / "SKILL.md").write_text("# beta\n", encoding="utf-8")
+
+    archive = tmp_path / "skills.zip"
+    skills_manager.pack_skills(archive, ["skill-beta"], [], [])
+
+    dest = tmp_path / "unpacked"
+    skills_manager.unpack_archive(archive, dest)
+    assert (dest / "skills" / "skill-beta" / "SKILL.md").read_text(encoding="utf-8") == "# beta\n"
+
+    # The unpacked tree round-trips through the regular parsers
+    monkeypatch.setattr(skills_manager, "BUNDLES_FILE", dest / "docs" / "BUNDLES.md")
+    monkeypatch.setattr(skills_manager, "WORKFLOWS_FILE", dest / "data" / "workflows.json")
+    assert skills_manager.parse_bundles()['🚀 The "Starter" Pack'] == ["skill-alpha", "skill-beta"]
+    assert "test-workflow" in skills_manager.parse_workflows()
+
+def test_phase_timer_counts_fs_calls(mock_dirs):
+    timer = skills_manager.TIMER
+    timer.enable()
+    try:
+        skills_manager.list_global()
+        skills_manager.install_skill(["skill-alpha"])
+        report = timer.report()
+    finally:
+        timer.disable()
+
+    scan = report["phases"]["scan"]
+    assert scan["items"] == 5
+    assert scan["calls"] > 0
+    assert report["phases"]["link"]["items"] == 1
+    assert report["phases"]["link"]["calls"] >= 1
+    # The shim is removed again
+    assert os.stat.__name__ == "stat"
+    assert not timer.counter.originals
+
+def test_main_timings_json(mock_dirs, monkeypatch, tmp_path, capsys):
+    out_file = tmp_path / "timings.jsonl"
+    monkeypatch.setenv(skills_manager.TIMINGS_JSON_ENV, str(out_file))
+    monkeypatch.setattr(sys, "argv", ["skills_manager.py", "--timings", "list", "--global"])
+
+    skills_manager.main()
+
+    captured = capsys.readouterr()
+    assert "skill-alpha" in captured.out
+    assert "Timings for 'list'" in captured.err
+    record = json.loads(out_file.read_text(encoding="utf-8").splitlines()[0])
+    assert record["command"] == "list"
+    assert set(record["phases"]) >= {"scan", "parse", "resolve", "link", "render"}
+    assert not skills_manager.TIMER.enabled
+
+def test_expand_skill_selectors(mock_dirs):
+    names = ["aws-lambda", "aws-s3", "test-driven", "testing-e2e", "writing-plans"]
+    calls = []
+
+    def candidates():
+        calls.append(1)
+        return names
+
+    # Plain names never trigger a catalog scan
+    assert skills_manager.expand_skill_selectors(["writing-plans"], candidates) == ["writing-plans"]
+    assert not calls
+
+    selected = skills_manager.expand_skill_selectors(["test*", "re:^aws-", "writing-plans", "aws-s3"], candidates)
+    assert selected == ["writing-plans", "aws-s3", "aws-lambda", "test-driven", "testing-e2e"]
+    assert len(calls) == 1
+
+def test_install_and_uninstall_with_selectors(mock_dirs, capsys):
+    _, project_repo, _, _ = mock_dirs
+
+    skills_manager.install_skill(["skill-*", "re:gamma$"])
+    assert sorted(p.name for p in project_repo.iterdir()) == ["complex-skill-gamma", "skill-alpha", "skill-beta"]
+    assert "Installed 3 of 3 skills" in capsys.readouterr().out
+
+    skills_manager.uninstall_skill(["skill-*"])
+    assert [p.name for p in project_repo.iterdir()] == ["complex-skill-gamma"]
+
+def test_install_from_file_selectors(mock_dirs, monkeypatch, tmp_path):
+    _, project_repo, _, _ = mock_dirs
+    selector_file = tmp_path / "skills.txt"
+    selector_file.write_text("# testing pack\nskill-alpha\n\nwriting-*\n", encoding="utf-8")
+    monkeypatch.setattr(sys, "argv", ["skills_manager.py", "install", "--from-file", str(selector_file)])
+
+    skills_manager.main()
+
+    assert (project_repo / "skill-alpha").is_symlink()
+    assert (project_repo / "writing-plans").is_symlink()
+
+def test_parse_bundles_multi_source_and_include(mock_dirs, monkeypatch, tmp_path, capsys):
+    _, project_repo, bundles_file, _ = mock_dirs
+
+    team_dir = tmp_path / "team"
+    team_dir.mkdir()
+    (team_dir / "extra.md").write_text("### Included Pack\n- [`writing-plans`](../skills/writing-plans/)\n", encoding="utf-8")
+    team_file = team_dir / "BUNDLES.md"
+    team_file.write_text(
+        "### 🚀 The \"Starter\" Pack\n- [`writing-plans`](../skills/writing-plans/)\n"
+        "<!-- include: extra.md -->\n"
+        "<!-- include: BUNDLES.md -->\n",  # cycles are ignored
+        encoding="utf-8",
+    )
+    monkeypatch.setenv(skills_manager.TEAM_BUNDLES_ENV, str(team_file))
+
+    bundles = skills_manager.parse_bundles()
+    # The team file shadows the global bundle of the same name
+    assert bundles['🚀 The "Starter" Pack'] == ["writing-plans"]
+    assert bundles["Included Pack"] == ["writing-plans"]
+    assert bundles['🔧 The "Complex" Pack'] == ["complex-skill-gamma"]
+
+    # Items after an include still belong to the bundle it appears in
+    team_file.write_text(
+        "### Split Pack\n- [`skill-alpha`](../skills/skill-alpha/)\n"
+        "<!-- include: extra.md -->\n"
+        "- [`skill-beta`](../skills/skill-beta/)\n",
+        encoding="utf-8",
+    )
+    bundles = skills_manager.parse_bundles()
+    assert bundles["Split Pack"] == ["skill-alpha", "skill-beta"]
+    assert bundles["Included Pack"] == ["writing-plans"]
+
+    capsys.readouterr()
+    skills_manager.list_bundles()
+    assert f"Listing Bundles from: {team_file}, {bundles_file}" in capsys.readouterr().out
+
+    # Editing an included file invalidates the cache
+    (team_dir / "extra.md").write_text("### Included Pack\n- [`skill-beta`](../skills/skill-beta/)\n", encoding="utf-8")
+    assert skills_manager.parse_bundles()["Included Pack"] == ["skill-beta"]
+
+def test_find_bundle_streams_and_uses_index(mock_dirs, monkeypatch):
+    read = []
+    original = skills_manager.iter_bundle_file
+
+    def tracking(path, visited):
+        read.append(path)
+        return original(path, visited)
+
+    monkeypatch.setattr(skills_manager, "iter_bundle_file", tracking)
+
+    # Cold cache: streaming lookup stops at the first exact normalized match
+    name, skills = skills_manager.find_bundle('the "starter" pack')
+    assert name == '🚀 The "Starter" Pack'
+    assert skills == ["skill-alpha", "skill-beta"]
+    assert skills_manager.load_bundles_section() is None
+
+    # Fuzzy fallback reads everything and caches the index
+    assert skills_manager.find_bundle("Complex")[0] == '🔧 The "Complex" Pack'
+    section = skills_manager.load_bundles_section()
+    assert section["index"]["thecomplexpack"] == '🔧 The "Complex" Pack'
+
+    # Warm cache: no file is parsed
+    read.clear()
+    assert skills_manager.find_bundle("THE COMPLEX PACK")[0] == '🔧 The "Complex" Pack'
+    assert not read
+
+def test_workflow_steps(mock_dirs, capsys):
+    _, project_repo, _, workflows_file = mock_dirs
+    workflows_file.write_text(json.dumps({"workflows": [{
+        "id": "stepped",
+        "name": "Stepped Workflow",
+        "steps": [
+            {"title": "Plan", "recommendedSkills": ["writing-plans", "skill-alpha"]},
+            {"title": "Build", "recommendedSkills": ["skill-alpha", "skill-beta"]},
+            {"title": "Ship", "recommendedSkills": ["complex-skill-gamma"]},
+        ],
+    }]}), encoding="utf-8")
+
+    # A skill installed by hand is never touched by step mode
+    skills_manager.install_skill(["skill-beta"])
+
+    skills_manager.install_workflow_step("stepped", 1)
+    assert sorted(p.name for p in project_repo.iterdir()) == ["skill-alpha", "skill-beta", "writing-plans"]
+    state = skills_manager.load_workflow_state()
+    assert state == {"workflow": "stepped", "step": 1, "skills": ["writing-plans", "skill-alpha"]}
+
+    capsys.readouterr()
+    skills_manager.next_workflow_step()
+    out = capsys.readouterr().out
+    assert "+0 -1" in out  # only writing-plans goes; skill-beta was already there
+    assert sorted(p.name for p in project_repo.iterdir()) == ["skill-alpha", "skill-beta"]
+
+    skills_manager.next_workflow_step()
+    assert sorted(p.name for p in project_repo.iterdir()) == ["complex-skill-gamma", "skill-beta"]
+    assert skills_manager.load_workflow_state()["step"] == 3
+
+    skills_manager.next_workflow_step()
+    assert "last step" in capsys.readouterr().out
+
+    # workflows.json shrank below the tracked step: reported, not an IndexError
+    workflows = json.loads(workflows_file.read_text(encoding="utf-8"))
+    del workflows["workflows"][0]["steps"][1:]
+    workflows_file.write_text(json.dumps(workflows), encoding="utf-8")
+    skills_manager.show_workflow_status()
+    skills_manager.next_workflow_step()
+    out = capsys.readouterr().out
+    assert "Tracked step 3 no longer exists" in out
+    assert "last step" not in out
+
+    skills_manager.uninstall_workflow(["stepped"])
+    assert skills_manager.load_workflow_state() is None
+
+def test_workflow_step_relinks_skills_removed_by_hand(mock_dirs, capsys):
+    _, project_repo, _, workflows_file = mock_dirs
+    workflows_file.write_text(json.dumps({"workflows": [{
+        "id": "w", "name": "W",
+        "steps": [{"title": "One", "recommendedSkills": ["skill-alpha", "writing-plans"]},
+                  {"title": "Two", "recommendedSkills": ["skill-alpha", "skill-beta"]}],
+    }]}), encoding="utf-8")
+    skills_manager.install_workflow_step("w", 1)
+    skills_manager.uninstall_skill(["skill-alpha", "writing-plans"])
+
+    capsys.readouterr()
+    skills_manager.next_workflow_step()
+    out = capsys.readouterr().out
+    assert "+2 -0 skills (2 active for this step)" in out
+    assert "  - writing-plans" not in out
+    assert sorted(p.name for p in project_repo.iterdir()) == ["skill-alpha", "skill-beta"]
+    assert skills_manager.load_workflow_state()["skills"] == ["skill-alpha", "skill-beta"]
+
+def test_workflow_state_rejects_malformed_file(mock_dirs, capsys):
+    state_path = skills_manager.get_workflow_state_path()
+    state_path.write_text("[1, 2]", encoding="utf-8")
+    assert skills_manager.load_workflow_state() is None
+    skills_manager.show_workflow_status()
+    assert "No workflow step is being tracked" in capsys.readouterr().out
+
+def write_skill_md(global_repo, name, size):
+    (global_repo / name / "SKILL.md").write_text("x" * (size - 1) + "\n", encoding="utf-8")
+
+def test_skill_sizes_are_cached(mock_dirs, monkeypatch):
+    global_repo, _, _, _ = mock_dirs
+    write_skill_md(global_repo, "skill-alpha", 400)
+
+    sizes = skills_manager.get_skill_sizes([("skill-alpha", global_repo / "skill-alpha")])
+    assert sizes["skill-alpha"]["bytes"] == 400
+    assert sizes["skill-alpha"]["lines"] == 1
+    assert sizes["skill-alpha"]["tokens"] == 100
+
+    # Warm lookups do not re-read the file
+    monkeypatch.setattr(skills_manager, "measure_skill_md", lambda path: pytest.fail("re-read"))
+    assert skills_manager.get_skill_sizes([("skill-alpha", global_repo / "skill-alpha")])["skill-alpha"]["tokens"] == 100
+
+def test_bundle_install_max_tokens(mock_dirs, capsys):
+    global_repo, project_repo, _, _ = mock_dirs
+    write_skill_md(global_repo, "skill-alpha", 4000)
+    write_skill_md(global_repo, "skill-beta", 4000)
+
+    skills_manager.install_bundle(["Starter"], max_tokens=1500)
+    assert "Nothing was installed" in capsys.readouterr().out
+    assert not list(project_repo.iterdir())
+
+    skills_manager.install_bundle(["Starter"], max_tokens=2000)
+    assert (project_repo / "skill-alpha").exists()
+    assert (project_repo / "skill-beta").exists()
+
+def test_max_tokens_measures_skills_in_their_source(mock_dirs, tmp_path, monkeypatch, capsys):
+    global_repo, project_repo, bundles_file, _ = mock_dirs
+    company = tmp_path / "company"
+    (company / "company-only").mkdir(parents=True)
+    write_skill_md(company, "company-only", 4000)
+    (global_repo / "archived-skill").mkdir()
+    write_skill_md(global_repo, "archived-skill", 4000)
+    archive = tmp_path / "team.zip"
+    skills_manager.pack_skills(archive, ["archived-skill"], [], [])
+    shutil.rmtree(global_repo / "archived-skill")
+    monkeypatch.setenv(skills_manager.SKILL_SOURCES_ENV, os.pathsep.join([str(company), str(archive)]))
+    with open(bundles_file, "a", encoding="utf-8") as f:
+        f.write("\n### Team\n- [`company-only`](../skills/company-only/)\n\n### Archived\n- [`archived-skill`](../skills/archived-skill/)\n")
+
+    skills_manager.install_bundle(["Team"], max_tokens=100)
+    assert "~1,000 tokens" in capsys.readouterr().out
+    skills_manager.install_bundle(["Archived"], max_tokens=100)
+    assert "~1,000 tokens" in capsys.readouterr().out
+    assert not list(project_repo.iterdir())
+
+    # An archive that cannot be read refuses the install instead of counting 0 tokens
+    assert skills_manager.get_archive_skill_sizes(tmp_path / "missing.zip", ["archived-skill"]) is None
+    monkeypatch.setattr(skills_manager, "get_archive_skill_sizes", lambda archive, names: None)
+    assert not skills_manager.check_token_budget(["archived-skill"], 100000)
+
+def test_budget_suggests_largest(mock_dirs, capsys):
+    global_repo, _, _, _ = mock_dirs
+    write_skill_md(global_repo, "skill-alpha", 4000)
+    write_skill_md(global_repo, "skill-beta", 400)
+    write_skill_md(global_repo, "writing-plans", 800)
+    skills_manager.install_skill(["skill-alpha", "skill-beta", "writing-plans"])
+    capsys.readouterr()
+
+    skills_manager.show_budget(max_tokens=500)
+    out = capsys.readouterr().out
+    assert "Total: ~1,300 tokens" in out
+    assert "uninstall skill-alpha\n" in out
+
+    skills_manager.list_project(show_sizes=True)
+    assert "~1,000 tokens" in capsys.readouterr().out
+
+def test_reindex_parallel_and_resumable(mock_dirs, monkeypatch, capsys):
+    global_repo, _, _, _ = mock_dirs
+    (global_repo / "skill-alpha" / "SKILL.md").write_text(
+        "---\nname: Skill Alpha\ndescription: \"The first skill\"\n---\n# Alpha\n", encoding="utf-8")
+    (global_repo / "skill-alpha" / "notes.txt").write_text("12345", encoding="utf-8")
+    write_skill_md(global_repo, "skill-beta", 40)
+
+    skills_manager.reindex(jobs=2)
+    out = capsys.readouterr().out
+    assert "Checking 5 skills with 2 jobs" in out
+    assert "Indexed 5 of 5 skills" in out
+
+    entries = skills_manager.load_catalog()["skills"]
+    assert set(entries) == {"skill-alpha", "skill-beta", "complex-skill-gamma", "writing-plans", "hidden-skill"}
+    alpha = entries["skill-alpha"]
+    assert alpha["meta"]["name"] == "Skill Alpha"
+    assert alpha["meta"]["description"] == "The first skill"
+    assert alpha["meta"]["files"] == 2
+    assert alpha["size"]["lines"] == 5
+
+    # Only changed skills are indexed again
+    write_skill_md(global_repo, "skill-beta", 80)
+    skills_manager.reindex(jobs=1)
+    assert "Indexed 1 of 5 skills (4 unchanged)" in capsys.readouterr().out
+    assert skills_manager.load_catalog()["skills"]["skill-beta"]["size"]["bytes"] == 80
+
+    # The freshness check runs in index_skill (i.e. in the workers), not in the parent
+    results = []
+    index_skill = skills_manager.index_skill
+    monkeypatch.setattr(skills_manager, "index_skill", lambda job: results.append(index_skill(job)) or results[-1])
+    skills_manager.reindex(jobs=1)
+    assert "up to date" in capsys.readouterr().out
+    assert len(results) == 5 and all(entry is None for _, entry in results)
+    monkeypatch.setattr(skills_manager, "index_skill", index_skill)
+
+    # Adding or removing an asset re-indexes the skill even though SKILL.md is unchanged
+    (global_repo / "skill-alpha" / "extra.txt").write_text("more", encoding="utf-8")
+    skills_manager.reindex(jobs=1)
+    assert "Indexed 1 of 5 skills (4 unchanged)" in capsys.readouterr().out
+    assert skills_manager.load_catalog()["skills"]["skill-alpha"]["meta"]["files"] == 3
+
+    (global_repo / "skill-alpha" / "notes.txt").unlink()
+    skills_manager.reindex(jobs=1)
+    assert "Indexed 1 of 5 skills (4 unchanged)" in capsys.readouterr().out
+    assert skills_manager.load_catalog()["skills"]["skill-alpha"]["meta"]["files"] == 2
+
+def test_hash_skill_dir_uses_stat_cache(mock_dirs, monkeypatch):
+    global_repo, _, _, _ = mock_dirs
+    skill_dir = global_repo / "skill-alpha"
+    (skill_dir / "SKILL.md").write_text("# alpha\n", encoding="utf-8")
+    (skill_dir / "ref").mkdir()
+    (skill_dir / "ref" / "a.md").write_text("a", encoding="utf-8")
+
+    cache = {}
+    root, files = skills_manager.hash_skill_dir(skill_dir, cache)
+    assert set(files) == {"SKILL.md", "ref/a.md"}
+
+    # Unchanged files are never re-read
+    real_open = open
+    def guarded_open(path, *args, **kwargs):
+        assert "skill-alpha" not in str(path), "file was re-read"
+        return real_open(path, *args, **kwargs)
+    monkeypatch.setattr("builtins.open", guarded_open)
+    assert skills_manager.hash_skill_dir(skill_dir, cache)[0] == root
+    monkeypatch.undo()
+
+    (skill_dir / "ref" / "a.md").write_text("changed", encoding="utf-8")
+    assert skills_manager.hash_skill_dir(skill_dir, cache)[0] != root
+
+def test_status_and_upgrade_copied_skills(mock_dirs, capsys):
+    global_repo, project_repo, _, _ = mock_dirs
+    for name in ("skill-alpha", "skill-beta", "writing-plans"):
+        (global_repo / name / "SKILL.md").write_text(f"# {name}\n", encoding="utf-8")
+    (global_repo / "skill-alpha" / "old.txt").write_text("old", encoding="utf-8")
+
+    skills_manager.install_skill_copy(["skill-alpha", "skill-beta"])
+    skills_manager.install_skill(["writing-plans"])
+    assert (project_repo / "skill-alpha").is_dir() and not (project_repo / "skill-alpha").is_symlink()
+
+    # Global changes make alpha outdated; a local edit makes beta modified
+    (global_repo / "skill-alpha" / "SKILL.md").write_text("# alpha v2\n", encoding="utf-8")
+    (global_repo / "skill-alpha" / "old.txt").unlink()
+    (project_repo / "skill-beta" / "SKILL.md").write_text("# my notes\n", encoding="utf-8")
+    capsys.readouterr()
+
+    skills_manager.show_status()
+    out = capsys.readouterr().out
+    assert "skill-alpha" in out and "outdated" in out
+    assert "modified" in out
+    assert "linked" in out
+
+    skills_manager.upgrade_skills([])
+    out = capsys.readouterr().out
+    assert "Upgraded skill-alpha (1 files copied, 1 removed)" in out
+    assert "skill-beta has local modifications" in out
+    assert (project_repo / "skill-alpha" / "SKILL.md").read_text(encoding="utf-8") == "# alpha v2\n"
+    assert not (project_repo / "skill-alpha" / "old.txt").exists()
+
+    skills_manager.show_status()
+    out = capsys.readouterr().out
+    assert "1 up-to-date" in out
+
+def test_complete_names_uses_sorted_cache(mock_dirs, monkeypatch):
+    global_repo, project_repo, _, _ = mock_dirs
+    assert skills_manager.complete_names("skill", "skill-") == ["skill-alpha", "skill-beta"]
+    assert skills_manager.complete_names("bundle", "") == ['🔧 The "Complex" Pack', '🚀 The "Starter" Pack']
+    assert skills_manager.complete_names("workflow", "test") == ["test-workflow"]
+
+    # Unchanged sources: served from the completion file without rescanning
+    rebuild = skills_manager.rebuild_completion_cache
+    calls = []
+    monkeypatch.setattr(skills_manager, "rebuild_completion_cache", lambda: calls.append(1) or rebuild())
+    assert skills_manager.complete_names("skill", "complex") == ["complex-skill-gamma"]
+    assert calls == []
+
+    # Adding a skill changes the repo directory stamp and refreshes the file
+    (global_repo / "skill-delta").mkdir()
+    os.utime(global_repo, ns=(0, 1))
+    assert "skill-delta" in skills_manager.complete_names("skill", "skill-")
+
+def test_completion_script_covers_parser_tree(capsys):
+    skills_manager.print_completion_script("bash", "skills")
+    script = capsys.readouterr().out
+    assert "complete -F _skills skills" in script
+    assert 'install) kind="bundle"' in script
+    assert 'pack) kind=""' in script  # first positional is the archive path, not a skill
+    assert "--max-tokens" in script
+
+    skills_manager.print_completion_script("fish", "skills")
+    assert "__complete workflow" in capsys.readouterr().out
+
+@pytest.mark.skipif(skills_manager.fcntl is None, reason="fcntl locking is POSIX only")
+def test_file_lock_shared_and_exclusive(mock_dirs, monkeypatch):
+    monkeypatch.setenv(skills_manager.LOCK_TIMEOUT_ENV, "0.1")
+    fcntl = skills_manager.fcntl
+    _, project_repo, _, _ = mock_dirs
+    lock_path = project_repo.parent / skills_manager.PROJECT_LOCK_FILENAME
+
+    # Simulate another process holding a shared lock (flock is per open file)
+    fd = os.open(lock_path, os.O_RDWR | os.O_CREAT)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_SH)
+        with skills_manager.file_lock(lock_path, exclusive=False, timeout=0.1):
+            pass  # readers do not block each other
+        with pytest.raises(skills_manager.LockTimeout):
+            with skills_manager.file_lock(lock_path, exclusive=True, timeout=0.1):
+                pass
+        with pytest.raises(skills_manager.LockTimeout):
+            skills_manager.install_skill(["skill-alpha"])
+        assert not (project_repo / "skill-alpha").exists()
+    finally:
+        os.close(fd)
+
+    # Released: writers proceed, and nested acquisitions are re-entrant
+    with skills_manager.project_lock(exclusive=True):
+        skills_manager.install_skill(["skill-alpha"])
+    assert (project_repo / "skill-alpha").is_symlink()
+
+def test_incremental_filter_reuses_previous_results(monkeypatch):
+    names = [f"skill-{i:05d}-{'aws' if i % 3 else 'gcp'}" for i in range(50000)] + ["a-w-s", "-x"]
+    flt = skills_manager.IncrementalFilter(names)
+
+    def brute(query):
+        q, nq = query.lower(), skills_manager.normalize_name(query)
+        return [i for i, n in enumerate(names) if q in n.lower() or (nq and nq in skills_manager.normalize_name(n))]
+
+    checked = []
+    original = skills_manager.IncrementalFilter.matches
+    monkeypatch.setattr(skills_manager.IncrementalFilter, "matches",
+                        lambda self, *a: checked.append(1) or original(self, *a))
+
+    for step, query in enumerate(["a", "aw", "aws", "aw", "-", "-a", "-x", "0000", "00001"]):
+        checked.clear()
+        previous = list(flt.stack[-1][1])
+        assert flt.update(query) == brute(query), query
+        if step == 3:
+            assert checked == []  # popped back to a cached result set
+        if query in ("aws", "00001"):
+            assert len(checked) == len(previous)  # only the previous results were rescanned
+
+def test_run_picker_toggles_selection():
+    pytest.importorskip("curses")
+
+    class FakeScreen:
+        def __init__(self, keys):
+            self.keys = list(keys)
+            self.lines = []
+        def getmaxyx(self):
+            return (10, 80)
+        def erase(self):
+            self.lines = []
+        def addnstr(self, y, x, text, n, attr=0):
+            self.lines.append(text)
+        def refresh(self):
+            pass
+        def get_wch(self):
+            return self.keys.pop(0)
+
+    import curses
+    names = ["skill-alpha", "skill-beta", "writing-plans"]
+    screen = FakeScreen(["b", "e", " ", "\x7f", "\x7f", curses.KEY_DOWN, curses.KEY_DOWN, " ", "\n"])
+    selection = skills_manager.run_picker(screen, names, {}, {"writing-plans"})
+    assert selection == {"skill-beta", "writing-plans"}
+
+    assert skills_manager.run_picker(FakeScreen(["\x1b"]), names, {}, set()) is None
+
+def test_skill_sources_merge_and_shadow(mock_dirs, tmp_path, monkeypatch, capsys):
+    global_repo, project_repo, _, _ = mock_dirs
+    company = tmp_path / "company"
+    (company / "skill-alpha").mkdir(parents=True)
+    (company / "company-only").mkdir()
+
+    # An archive source providing one more skill
+    (global_repo / "archived-skill").mkdir()
+    (global_repo / "archived-skill" / "SKILL.md").write_text("archived", encoding="utf-8")
+    archive = tmp_path / "team.zip"
+    skills_manager.pack_skills(archive, ["archived-skill"], [], [])
+    shutil.rmtree(global_repo / "archived-skill")
+
+    monkeypatch.setenv(skills_manager.SKILL_SOURCES_ENV, os.pathsep.join([str(company), str(archive)]))
+    index = skills_manager.get_skill_index()
+    assert index["skill-alpha"] == company          # shadows the global repo
+    assert index["skill-beta"] == global_repo
+    assert index["archived-skill"] == archive
+
+    # Per-source caches: a second process-level lookup does not rescan unchanged sources
+    skills_manager._SOURCE_NAMES.clear()
+    scan_source = skills_manager.scan_source
+    monkeypatch.setattr(skills_manager, "scan_source", lambda source: pytest.fail(f"rescanned {source}"))
+    assert skills_manager.get_skill_index() == index
+    monkeypatch.setattr(skills_manager, "scan_source", scan_source)
+
+    skills_manager.install_skill_single("skill-alpha")
+    assert os.readlink(project_repo / "skill-alpha") == str(company / "skill-alpha")
+    skills_manager.install_skill(["company-only", "archived-skill", "skill-beta"])
+    assert (project_repo / "company-only").is_symlink()
+    assert (project_repo / "archived-skill" / "SKILL.md").read_text(encoding="utf-8") == "archived"
+    assert not (project_repo / "archived-skill").is_symlink()
+
+    capsys.readouterr()
+    skills_manager.search_skills("only")
+    assert "company-only" in capsys.readouterr().out
+
+def test_clear_moves_copies_to_trash(mock_dirs, monkeypatch):
+    global_repo, project_repo, _, _ = mock_dirs
+    (global_repo / "skill-beta" / "SKILL.md").write_text("beta", encoding="utf-8")
+    skills_manager.install_skill(["skill-alpha"])
+    skills_manager.install_skill_copy(["skill-beta", "complex-skill-gamma"])
+    trash = project_repo.parent / skills_manager.TRASH_DIRNAME
+
+    # Default: copies are renamed into the trash and deleted by a detached process
+    spawned = []
+    monkeypatch.setattr(skills_manager.subprocess, "Popen", lambda cmd, **kw: spawned.append(cmd))
+    skills_manager.clear_all_skills(force=True)
+    assert list(project_repo.iterdir()) == []
+    assert len(list(trash.iterdir())) == 2
+    assert spawned and spawned[0][-2:] == ["__purge-trash", str(trash)]
+    assert (global_repo / "skill-beta" / "SKILL.md").exists()
+
+    # --wait deletes the trash before returning
+    skills_manager.install_skill_copy(["skill-beta"])
+    skills_manager.uninstall_skill(["skill-*"], wait=True)
+    assert list(project_repo.iterdir()) == []
+    assert list(trash.iterdir()) == []
+
+def test_clear_reports_failed_move_of_existing_entry(mock_dirs, monkeypatch, capsys):
+    _, project_repo, _, _ = mock_dirs
+    skills_manager.install_skill_copy(["skill-beta"])
+
+    def vanished_trash(path):
+        raise FileNotFoundError("trash directory disappeared")
+    monkeypatch.setattr(skills_manager, "move_to_trash", vanished_trash)
+    skills_manager.clear_all_skills(force=True)
+    out = capsys.readouterr().out
+    assert "Failed to remove skill-beta" in out
+    assert "Cleared 0 skills" in out
+    assert (project_repo / "skill-beta").is_dir()
+
+def test_search_workflows_ranks_fields_and_reports_step(mock_dirs, capsys):
+    _, _, _, workflows_file = mock_dirs
+    workflows = {"workflows": [
+        {"id": "audit", "name": "Security Audit", "description": "Review code",
+         "steps": [{"title": "Scan", "notes": "run the deploy checks", "recommendedSkills": ["skill-alpha"]}]},
+        {"id": "ship", "name": "Ship It", "description": "Release",
+         "steps": [{"title": "Build", "recommendedSkills": ["skill-beta"]},
+                   {"title": "Deploy", "goal": "Go live", "recommendedSkills": ["deploy-helper"]}]},
+        {"id": "deploy-now", "name": "Deploy Now", "description": "Fast path", "steps": []},
+    ]}
+    workflows_file.write_text(json.dumps(workflows), encoding="utf-8")
+
+    section = skills_manager.load_workflows_section()
+    assert ["ship", "skill", 1] in section["index"]["deploy"]
+    assert section["vocab"] == sorted(section["index"])
+    assert "workflows" not in skills_manager.load_catalog()  # cached in its own file
+    assert skills_manager.load_workflows_section() == section
+
+    ranked = skills_manager.rank_workflows(section["index"], "deploy", section["vocab"])
+    assert [wf_id for _, wf_id, _ in ranked] == ["deploy-now", "ship", "audit"]  # name > skill > notes
+    assert skills_manager.rank_workflows(section["index"], "deploy live")[0][1] == "ship"
+    assert skills_manager.rank_workflows(section["index"], "secur")[0][1] == "audit"  # token prefix
+    assert skills_manager.rank_workflows(section["index"], "curity") == []  # not a prefix
+
+    capsys.readouterr()
+    skills_manager.search_workflows("deploy", limit=2)
+    out = capsys.readouterr().out
+    assert "Security Audit" not in out
+    assert "Matched step 2: Deploy (skill, title)" in out
+    assert "showing 2" in out
+
+    cache_file = skills_manager.CACHE_DIR / skills_manager.WORKFLOW_CACHE_FILENAME
+    assert cache_file.exists()
+    skills_manager.invalidate_catalog({"skills": set(), "bundles": False, "workflows": True})
+    assert not cache_file.exists()
+
+def test_scale_harness_per_skill_fs_calls():
+    import scale_harness
+    # Filesystem call counts are deterministic, so the per-skill caps hold even at small sizes
+    for scenario, budget in scale_harness.COMPLEXITY_BUDGETS.items():
+        base, run = (scale_harness.measure(scenario, n) for n in (0, 50))
+        assert (run["fs_calls"] - base["fs_calls"]) / 50 <= budget["fs_calls"][1], scenario
+
+    # Quadratic growth in filesystem calls is reported against an O(n) budget
+    sizes = [0, 10, 100]
+    quadratic = [{"fs_calls": 5 + n * n, "peak_bytes": 1000 + n} for n in sizes]
+    assert any("n^2" in f for f in scale_harness.check_budgets("list_project", sizes, quadratic))
+
+@pytest.mark.skipif(not os.environ.get("SKILLS_MANAGER_SCALE_TESTS"),
+                    reason="growth exponents need large sizes; set SKILLS_MANAGER_SCALE_TESTS=1")
+def test_scale_harness_budgets():
+    import scale_harness
+    with open(os.devnull, 'w') as out:
+        _, failures = scale_harness.run_harness(scale_harness.DEFAULT_SIZES, out=out)
+    assert failures == []
+
+def test_step_and_copy_installs_use_skill_sources(mock_dirs, tmp_path, monkeypatch):
+    global_repo, project_repo, _, workflows_file = mock_dirs
+    company = tmp_path / "company"
+    (company / "company-only").mkdir(parents=True)
+    (company / "company-only" / "SKILL.md").write_text("company", encoding="utf-8")
+    (global_repo / "archived-skill").mkdir()
+    (global_repo / "archived-skill" / "SKILL.md").write_text("archived", encoding="utf-8")
+    archive = tmp_path / "team.zip"
+    skills_manager.pack_skills(archive, ["archived-skill"], [], [])
+    shutil.rmtree(global_repo / "archived-skill")
+    monkeypatch.setenv(skills_manager.SKILL_SOURCES_ENV, os.pathsep.join([str(company), str(archive)]))
+
+    workflows_file.write_text(json.dumps({"workflows": [{
+        "id": "w", "name": "W",
+        "steps": [{"title": "One", "recommendedSkills": ["company-only", "archived-skill"]},
+                  {"title": "Two", "recommendedSkills": ["skill-alpha"]}],
+    }]}), encoding="utf-8")
+    skills_manager.install_workflow_step("w", 1)
+    assert os.readlink(project_repo / "company-only") == str(company / "company-only")
+    assert (project_repo / "archived-skill" / "SKILL.md").read_text(encoding="utf-8") == "archived"
+    assert skills_manager.load_workflow_state()["skills"] == ["company-only", "archived-skill"]
+
+    # Moving on removes the step's symlink and its extracted copy
+    skills_manager.next_workflow_step()
+    assert sorted(p.name for p in project_repo.iterdir()) == ["skill-alpha"]
+
+    skills_manager.install_skill_copy(["company-only", "archived-skill"])
+    assert (project_repo / "company-only" / "SKILL.md").read_text(encoding="utf-8") == "company"
+    assert not (project_repo / "company-only").is_symlink()
+    assert set(skills_manager.load_manifest()) >= {"company-only", "archived-skill"}
+
+def test_status_and_upgrade_use_shadowing_source(mock_dirs, tmp_path, monkeypatch, capsys):
+    global_repo, project_repo, _, _ = mock_dirs
+    (global_repo / "skill-alpha" / "SKILL.md").write_text("global", encoding="utf-8")
+    company = tmp_path / "company"
+    (company / "skill-alpha").mkdir(parents=True)
+    (company / "skill-alpha" / "SKILL.md").write_text("company v1", encoding="utf-8")
+    (global_repo / "archived-skill").mkdir()
+    (global_repo / "archived-skill" / "SKILL.md").write_text("archived", encoding="utf-8")
+    archive = tmp_path / "team.zip"
+    skills_manager.pack_skills(archive, ["archived-skill"], [], [])
+    (global_repo / "archived-skill" / "SKILL.md").write_text("global archived", encoding="utf-8")
+    monkeypatch.setenv(skills_manager.SKILL_SOURCES_ENV, os.pathsep.join([str(company), str(archive)]))
+
+    skills_manager.install_skill_copy(["skill-alpha", "archived-skill"])
+    capsys.readouterr()
+    skills_manager.show_status()
+    out = capsys.readouterr().out
+    assert "outdated" not in out and "differs" not in out
+    assert "archived" in out
+
+    # Upgrades come from the shadowing source, never from the global repo or for archive copies
+    (company / "skill-alpha" / "SKILL.md").write_text("company v2", encoding="utf-8")
+    skills_manager.upgrade_skills([])
+    assert (project_repo / "skill-alpha" / "SKILL.md").read_text(encoding="utf-8") == "company v2"
+    assert (project_repo / "archived-skill" / "SKILL.md").read_text(encoding="utf-8") == "archived"
+
+def test_pack_documented_command_parses():
+    readme = (Path(__file__).resolve().parent.parent / "README.md").read_text(encoding="utf-8")
+    line = next(l for l in readme.splitlines() if l.startswith("python skills_manager.py pack "))
+    import shlex
+    args = skills_manager.build_parser().parse_args(shlex.split(line)[2:])
+    assert args.skill_names == ["concise-planning", "lint-and-validate"]
+    assert args.bundles == ["Essentials"] and args.workflows == ["ship-saas-mvp"]
+
+@pytest.mark.skipif(skills_manager.fcntl is None, reason="fcntl locking is POSIX only")
+def test_project_lock_is_created_only_by_writes(mock_dirs, tmp_path, monkeypatch):
+    fresh = tmp_path / "fresh"
+    monkeypatch.setattr(skills_manager, "PROJECT_SKILLS_DIR", fresh / ".agent" / "skills")
+    skills_manager.uninstall_skill(["nothing-here"])
+    skills_manager.install_skill_copy(["nothing-here"])
+    assert not fresh.exists()
+
+    # The exclusive lock is taken as soon as the install creates .agent
+    locked_modes = []
+    acquire = skills_manager.acquire_lock_fd
+    monkeypatch.setattr(skills_manager, "acquire_lock_fd",
+                        lambda path, exclusive, timeout: locked_modes.append(exclusive) or acquire(path, exclusive, timeout))
+    skills_manager.install_skill(["skill-alpha"])
+    assert (fresh / ".agent" / "skills" / "skill-alpha").is_symlink()
+    assert locked_modes == [True]
+    assert (fresh / ".agent" / skills_manager.PROJECT_LOCK_FILENAME).exists()